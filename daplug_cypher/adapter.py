@@ -1,17 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import hashlib
+import os
+import threading
+from typing import Any, ClassVar, ContextManager, Dict, List, Optional, Tuple
 from typing_extensions import Unpack
 
 from neo4j import GraphDatabase
 from neo4j import Driver, Session, Transaction
 
 from daplug_core.base_adapter import BaseAdapter
+from daplug_core.types import PublisherProtocol
+from daplug_cypher import publisher
 from daplug_cypher.cypher.support import SupportUtilities
 from daplug_cypher.types.options import (
     AdapterConfig,
     CreateParams,
     DeleteParams,
+    PublishOptions,
     QueryParams,
     ReadParams,
     RelationshipParams,
@@ -20,9 +26,12 @@ from daplug_cypher.types.options import (
 
 
 class CypherAdapter(BaseAdapter):
+    _driver_pool: ClassVar[Dict[Tuple[Any, ...], Driver]] = {}
+    _driver_pool_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self, **config: Unpack[AdapterConfig]) -> None:
         super().__init__(**config)
+        self.publisher: PublisherProtocol = config.get("publisher", publisher)
         self.auto_connect: bool = config.get("auto_connect", True)
         self.bolt: Dict[str, Any] = config.get("bolt", {})
         self.neptune: Optional[Dict[str, Any]] = config.get("neptune")
@@ -30,7 +39,8 @@ class CypherAdapter(BaseAdapter):
         self.schema_name: Optional[str] = config.get("schema")
         self.validate_schema: bool = config.get("validate_schema", True)
         self.driver_config: Dict[str, Any] = config.get("driver_config", {})
-        self._driver: Optional[Driver] = None
+        self._driver: Optional[Driver] = config.get("driver")
+        self._owns_driver: bool = self._driver is None
         self._session: Optional[Session] = None
         self.support = SupportUtilities(self)
 
@@ -38,6 +48,31 @@ class CypherAdapter(BaseAdapter):
         if self._session:
             return
 
+        if self._driver is None:
+            self._driver = self._connect()
+        self._session = self._driver.session()
+
+    def close(self) -> None:
+        if self._session:
+            self._session.close()
+            self._session = None
+        if self._owns_driver:
+            self._driver = None
+
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        with cls._driver_pool_lock:
+            for driver in cls._driver_pool.values():
+                driver.close()
+            cls._driver_pool.clear()
+
+    @classmethod
+    def _reset_pool_after_fork(cls) -> None:
+        # The child must not reuse or close the parent's sockets, and the lock may have been held mid-fork.
+        cls._driver_pool = {}
+        cls._driver_pool_lock = threading.Lock()
+
+    def _connect(self) -> Driver:
         bolt_config = self.support.resolve_bolt_config()
         uri = bolt_config.get("url")
         user = bolt_config.get("user")
@@ -46,19 +81,19 @@ class CypherAdapter(BaseAdapter):
         if not uri or not user:
             raise ValueError("bolt configuration requires 'url' and 'user'")
 
-        auth = (user, password) if password is not None else None
-        driver: Driver = GraphDatabase.driver(uri, auth=auth, **self.driver_config)
-        session: Session = driver.session()
-        self._driver = driver
-        self._session = session
+        key = self._driver_pool_key(uri, user, password)
+        with self._driver_pool_lock:
+            driver = self._driver_pool.get(key)
+            if driver is None:
+                auth = (user, password) if password is not None else None
+                driver = GraphDatabase.driver(uri, auth=auth, **self.driver_config)
+                self._driver_pool[key] = driver
+        return driver
 
-    def close(self) -> None:
-        if self._session:
-            self._session.close()
-            self._session = None
-        if self._driver:
-            self._driver.close()
-            self._driver = None
+    def _driver_pool_key(self, uri: str, user: str, password: Optional[str]) -> Tuple[Any, ...]:
+        password_digest = hashlib.sha256(str(password).encode()).hexdigest() if password is not None else None
+        config = tuple(sorted((key, repr(value)) for key, value in self.driver_config.items()))
+        return (uri, user, password_digest, config)
 
     def _auto_open(self) -> None:
         if self.auto_connect:
@@ -68,6 +103,26 @@ class CypherAdapter(BaseAdapter):
         if self.auto_connect:
             self.close()
 
+    def publish_batch(self, items: List[Tuple[Any, PublishOptions]]) -> None:
+        batch_publish = getattr(self.publisher, "publish_batch", None)
+        if batch_publish is None:
+            for payload, options in items:
+                self.publish(payload, **options)
+            return
+        entries = [
+            {
+                "data": payload,
+                "attributes": self.create_format_attributes(options.get("sns_attributes", {})),
+                "fifo_group_id": options.get("fifo_group_id"),
+                "fifo_duplication_id": options.get("fifo_duplication_id"),
+            }
+            for payload, options in items
+        ]
+        batch_publish(endpoint=self.sns_endpoint, arn=self.sns_arn, entries=entries)
+
+    def batched_publish(self) -> ContextManager[None]:
+        return self.support.batched_publish()
+
     def create(self, **params: Unpack[CreateParams]) -> Dict[str, Any]:
         node_label = params.get("node") or params.get("label")
         if not node_label:
@@ -104,6 +159,7 @@ class CypherAdapter(BaseAdapter):
             node_label=node_label,
             serialize=serialize,
             search=search,
+            materialize=params.get("materialize", True),
         )
         return records
 
@@ -146,6 +202,7 @@ class CypherAdapter(BaseAdapter):
             node_label=node_label,
             serialize=False,
             search=params.get("search", False),
+            materialize=True,
         )
         if not original_records:
             raise ValueError("ATOMIC ERROR: No records found; record may have been deleted")
@@ -242,3 +299,7 @@ class CypherAdapter(BaseAdapter):
             return result_list
         finally:
             self._auto_close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=CypherAdapter._reset_pool_after_fork)  # pylint: disable=protected-access
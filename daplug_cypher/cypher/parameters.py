@@ -1,32 +1,46 @@
 """Utilities for preparing Cypher parameter dictionaries."""
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+# Exact scalar types that never need conversion; checked with one set lookup per value.
+_PASSTHROUGH_TYPES = frozenset({int, float, bool, type(None)})
 
 
 def convert_placeholders(placeholder: Dict[str, Any]) -> Dict[str, Any]:
     """Convert numeric strings and nested structures for Cypher parameters."""
-    return {
-        key: _convert_value(value)
-        for key, value in placeholder.items()
-    }
-
-
-def _convert_value(value: Any) -> Any:
-    if isinstance(value, dict):
-        return convert_placeholders(value)
-    if isinstance(value, list):
-        return [_convert_value(item) for item in value]
-    if isinstance(value, str) and _is_numeric(value):
-        try:
-            return int(value)
-        except ValueError:
-            return value
-    return value
+    converted: Dict[str, Any] = {}
+    # Nested containers are copied into pre-allocated targets from an explicit stack instead of recursing.
+    pending: List[Tuple[Any, Any]] = [(placeholder, converted)]
+    while pending:
+        source, target = pending.pop()
+        # Dispatch on the target: the root may be any Mapping, but targets are only ever dicts or lists.
+        items = enumerate(source) if isinstance(target, list) else source.items()
+        for key, value in items:
+            value_type = type(value)
+            if value_type in _PASSTHROUGH_TYPES:
+                target[key] = value
+            elif value_type is str:
+                target[key] = _convert_string(value)
+            elif isinstance(value, dict):
+                target[key] = {}
+                pending.append((value, target[key]))
+            elif isinstance(value, list):
+                target[key] = [None] * len(value)
+                pending.append((value, target[key]))
+            elif isinstance(value, str):
+                target[key] = _convert_string(value)
+            else:
+                target[key] = value
+    return converted
 
 
-def _is_numeric(value: str) -> bool:
-    if not value:
-        return False
-    if value.startswith("-"):
-        return value[1:].isdigit()
-    return value.isdigit()
+def _convert_string(value: str) -> Any:
+    # Only strings that look like integers reach int(); the except guards digit
+    # characters str.isdigit accepts but int() rejects (e.g. superscripts).
+    digits = value[1:] if value[:1] == "-" else value
+    if not digits.isdigit():
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return value
@@ -0,0 +1,31 @@
+"""Default Cypher statements, built once per label/key combination.
+
+Every value travels as a ``$`` parameter, so the generated text is stable per
+label and Neo4j can reuse its cached execution plan across calls.
+"""
+
+import functools
+
+
+@functools.lru_cache(maxsize=256)
+def create_query(node_label: str) -> str:
+    return f"CREATE (n:{node_label}) SET n = $placeholder RETURN n"
+
+
+@functools.lru_cache(maxsize=256)
+def update_query(node_label: str, identifier: str, idempotence_key: str) -> str:
+    return (
+        f"MATCH (n:{node_label}) "
+        f"WHERE n.{identifier} = $id AND n.{idempotence_key} = $version "
+        f"SET n = $placeholder RETURN n"
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def read_before_delete_query(node_label: str, identifier: str) -> str:
+    return f"MATCH (n:{node_label}) WHERE n.{identifier} = $id RETURN n LIMIT 1"
+
+
+@functools.lru_cache(maxsize=256)
+def delete_query(node_label: str, identifier: str) -> str:
+    return f"MATCH (n:{node_label}) WHERE n.{identifier} = $id WITH n LIMIT 1 DETACH DELETE n"
@@ -0,0 +1,71 @@
+"""Schema projection with the OpenAPI model compiled to a field table cached per file revision."""
+
+import functools
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import jsonref
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+_VALUE = "value"
+_OBJECT = "object"
+_ARRAY = "array"
+
+# (key, kind, nested fields) triples; nested is empty for plain values.
+Field = Tuple[str, str, Tuple[Any, ...]]
+FieldTable = Tuple[Field, ...]
+
+
+def map_with_cached_schema(data: Optional[Dict[str, Any]], schema_file: str, schema_name: str) -> Dict[str, Any]:
+    """Project ``data`` onto ``schema_name``, recompiling ``schema_file`` only when it changes on disk."""
+    mtime = os.stat(schema_file).st_mtime
+    return _apply(_compiled_fields(schema_file, mtime, schema_name), data)
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled_fields(schema_file: str, _mtime: float, schema_name: str) -> FieldTable:
+    schema = _load_schema(schema_file, schema_name)
+    fields: Dict[str, Field] = {}
+    models = schema["allOf"] if schema.get("allOf") else [schema]
+    for model in models:
+        if model.get("type") == "object":
+            fields.update(_compile_properties(model.get("properties", {})))
+    return tuple(fields.values())
+
+
+def _load_schema(schema_file: str, schema_name: str) -> Dict[str, Any]:
+    with open(schema_file, encoding="UTF-8") as openapi:
+        api_doc = yaml.load(openapi, Loader=_YamlLoader)
+    return jsonref.replace_refs(api_doc)["components"]["schemas"][schema_name]
+
+
+def _compile_properties(properties: Dict[str, Any]) -> Dict[str, Field]:
+    fields: Dict[str, Field] = {}
+    for key, spec in properties.items():
+        if spec.get("properties"):
+            fields[key] = (key, _OBJECT, tuple(_compile_properties(spec["properties"]).values()))
+        elif spec.get("items", {}).get("properties"):
+            fields[key] = (key, _ARRAY, tuple(_compile_properties(spec["items"]["properties"]).values()))
+        else:
+            fields[key] = (key, _VALUE, ())
+    return fields
+
+
+def _apply(fields: FieldTable, data: Any) -> Dict[str, Any]:
+    if not data or not isinstance(data, dict):
+        return {}
+    mapped: Dict[str, Any] = {}
+    for key, kind, nested in fields:
+        value = data.get(key)
+        if kind == _OBJECT:
+            mapped[key] = _apply(nested, value)
+        elif kind == _ARRAY:
+            mapped[key] = [_apply(nested, item) for item in value] if value and isinstance(value, list) else []
+        else:
+            mapped[key] = value
+    return mapped
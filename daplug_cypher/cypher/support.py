@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, cast, Mapping
+import contextlib
+import contextvars
+import functools
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional, Tuple, cast, Mapping
 from typing_extensions import Unpack
 
 from daplug_core.base_adapter import BaseAdapter
 from daplug_core.dict_merger import merge
-from daplug_core.schema_mapper import map_to_schema
 
+from daplug_cypher.cypher import queries
 from daplug_cypher.cypher.parameters import convert_placeholders
+from daplug_cypher.cypher.schema import map_with_cached_schema
 from daplug_cypher.cypher.serialization import serialize_records
 from daplug_cypher.types.options import (
     AdapterSerializationOptions,
@@ -17,39 +22,36 @@ from daplug_cypher.types.options import (
     SerializeRecordsOptions,
 )
 
+PendingPublishes = List[Tuple[Any, PublishOptions]]
+
+# Context-local so a thread sharing an adapter never lands in another thread's open batch. A single var keyed
+# by id(SupportUtilities), because a Context keeps every var ever set alive; the mapping is replaced, never mutated.
+_PENDING_PUBLISHES: contextvars.ContextVar[Mapping[int, PendingPublishes]] = contextvars.ContextVar(
+    "daplug_cypher_pending_publishes", default=MappingProxyType({})
+)
+
 
 class SupportUtilities:
+    _PUBLISH_KEYS = frozenset({"sns_attributes", "fifo_group_id", "fifo_duplication_id"})
+    _MERGE_KEYS = frozenset({"update_list_operation", "update_dict_operation"})
 
     def __init__(self, adapter: 'CypherAdapter') -> None:  # type: ignore
         self.adapter = adapter
 
     def map_with_schema(self, data: Dict[str, Any]) -> Dict[str, Any]:
         if self.adapter.schema_file and self.adapter.schema_name:
-            return map_to_schema(data, self.adapter.schema_file, self.adapter.schema_name)
+            return map_with_cached_schema(data, self.adapter.schema_file, self.adapter.schema_name)
         return dict(data)
 
     def extract_publish_options(self, source: Mapping[str, Any]) -> PublishOptions:
-        options: PublishOptions = {}
-        sns_attributes = source.get("sns_attributes")
-        if isinstance(sns_attributes, dict):
-            options["sns_attributes"] = cast(Dict[str, Any], sns_attributes)
-        fifo_group = source.get("fifo_group_id")
-        if fifo_group is not None:
-            options["fifo_group_id"] = fifo_group
-        fifo_dup = source.get("fifo_duplication_id")
-        if fifo_dup is not None:
-            options["fifo_duplication_id"] = fifo_dup
-        return options
+        options = {key: source[key] for key in self._PUBLISH_KEYS & source.keys() if source[key] is not None}
+        if not isinstance(options.get("sns_attributes", {}), dict):
+            del options["sns_attributes"]
+        return cast(PublishOptions, options)
 
     def extract_merge_options(self, source: Mapping[str, Any]) -> MergeOptions:
-        options: MergeOptions = {}
-        list_op = source.get("update_list_operation")
-        if list_op is not None:
-            options["update_list_operation"] = list_op
-        dict_op = source.get("update_dict_operation")
-        if dict_op is not None:
-            options["update_dict_operation"] = dict_op
-        return options
+        options = {key: source[key] for key in self._MERGE_KEYS & source.keys() if source[key] is not None}
+        return cast(MergeOptions, options)
 
     def extract_read_before_delete_options(self, source: Mapping[str, Any]) -> ReadBeforeDeleteOptions:
         options: ReadBeforeDeleteOptions = {}
@@ -67,8 +69,38 @@ class SupportUtilities:
             publish_kwargs["fifo_group_id"] = options.get("fifo_group_id")
         if options.get("fifo_duplication_id") is not None:
             publish_kwargs["fifo_duplication_id"] = options.get("fifo_duplication_id")
+        pending = self._pending_publishes()
+        if pending is not None:
+            pending.append((payload, publish_kwargs))
+            return
         adapter.publish(payload, **publish_kwargs)
 
+    def _pending_publishes(self) -> Optional[PendingPublishes]:
+        return _PENDING_PUBLISHES.get().get(id(self))
+
+    def begin_publish_batch(self) -> None:
+        if self._pending_publishes() is None:
+            _PENDING_PUBLISHES.set({**_PENDING_PUBLISHES.get(), id(self): []})
+
+    def flush_publish_batch(self) -> None:
+        batches = _PENDING_PUBLISHES.get()
+        pending = batches.get(id(self))
+        if pending is not None:
+            _PENDING_PUBLISHES.set({key: batch for key, batch in batches.items() if key != id(self)})
+        if pending:
+            self.adapter.publish_batch(pending)
+
+    @contextlib.contextmanager
+    def batched_publish(self) -> Iterator[None]:
+        if self._pending_publishes() is not None:
+            yield
+            return
+        self.begin_publish_batch()
+        try:
+            yield
+        finally:
+            self.flush_publish_batch()
+
     def merge_payload(self, original: Dict[str, Any], incoming: Dict[str, Any], **options: Unpack[MergeOptions]) -> Dict[str, Any]:
         return merge(original, incoming, **options)
 
@@ -81,7 +113,7 @@ class SupportUtilities:
         return serialize_records(records, **serialize_options)
 
     def clean_placeholders(self, placeholder: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        if placeholder is None:
+        if not placeholder:
             return {}
         return convert_placeholders(placeholder)
 
@@ -109,32 +141,31 @@ class SupportUtilities:
         return self.adapter._session.run(query, parameters)  # pylint: disable=protected-access
 
     def default_create_query(self, node_label: str) -> str:
-        return f"CREATE (n:{node_label}) SET n = $placeholder RETURN n"
+        return queries.create_query(node_label)
 
     def default_update_query(self, node_label: str, identifier: str, idempotence_key: str) -> str:
-        return (
-            f"MATCH (n:{node_label}) "
-            f"WHERE n.{identifier} = $id AND n.{idempotence_key} = $version "
-            f"SET n = $placeholder RETURN n"
-        )
+        return queries.update_query(node_label, identifier, idempotence_key)
 
     def match(self, query: str, placeholder: Optional[Dict[str, Any]], **options: Unpack[AdapterSerializationOptions]) -> Any:
         node_label = options.get("node_label")
         serialize = options.get("serialize", True)
         search = options.get("search", False)
+        materialize = options.get("materialize", True)
         self.adapter._auto_open()  # pylint: disable=protected-access
         try:
             parameters = self.clean_placeholders(placeholder)
             result = self.run_read(query, parameters)
-            records = list(result)
             if serialize:
-                return self.serialize_records(records, node_label=node_label, serialize=True, search=search)
-            return records
+                return self.serialize_records(result, node_label=node_label, serialize=True, search=search)
+            # An auto-connect session closes below, so its result has to be drained first.
+            if materialize or self.adapter.auto_connect:
+                return list(result)
+            return result
         finally:
             self.adapter._auto_close()  # pylint: disable=protected-access
 
     def get_before_delete(self, node_label: str, identifier: str, delete_identifier: Any, **options: Unpack[ReadBeforeDeleteOptions]) -> Dict[str, Any]:
-        read_query = options.get("read_query") or f"MATCH (n:{node_label}) WHERE n.{identifier} = $id RETURN n LIMIT 1"
+        read_query = options.get("read_query") or queries.read_before_delete_query(node_label, identifier)
         records = self.match(
             read_query,
             {"id": delete_identifier},
@@ -145,14 +176,12 @@ class SupportUtilities:
         if isinstance(records, dict):
             nodes = records.get(node_label, [])
             return nodes[0] if nodes else {}
-        if isinstance(records, list) and records:
-            return records[0]
+        if isinstance(records, list):
+            return next(iter(records), {})
         return {}
 
     def perform_delete(self, node_label: str, identifier: str, delete_identifier: Any, delete_query: Optional[str]) -> None:
-        delete_query = delete_query or (
-            f"MATCH (n:{node_label}) WHERE n.{identifier} = $id WITH n LIMIT 1 DETACH DELETE n"
-        )
+        delete_query = delete_query or queries.delete_query(node_label, identifier)
         parameters = self.clean_placeholders({"id": delete_identifier})
         self.adapter._auto_open()  # pylint: disable=protected-access
         try:
@@ -161,6 +190,13 @@ class SupportUtilities:
             self.adapter._auto_close()  # pylint: disable=protected-access
 
     def first_node(self, record: Any) -> Optional[Any]:
+        if callable(getattr(record, "value", None)):
+            try:
+                value = record.value()
+            except (IndexError, KeyError):
+                value = None
+            if self.is_node(value):
+                return value
         if hasattr(record, "values"):
             for value in record.values():
                 if self.is_node(value):
@@ -168,8 +204,13 @@ class SupportUtilities:
         return None
 
     def is_node(self, value: Any) -> bool:
-        try:
-            from neo4j.graph import Node  # pylint: disable=import-outside-toplevel
-        except ImportError as exc:
-            raise RuntimeError("neo4j package is required for CypherAdapter") from exc
-        return isinstance(value, Node)
+        return isinstance(value, _node_type())
+
+
+@functools.lru_cache(maxsize=None)
+def _node_type() -> type:
+    try:
+        from neo4j.graph import Node  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise RuntimeError("neo4j package is required for CypherAdapter") from exc
+    return Node
@@ -0,0 +1,83 @@
+"""SNS publisher with batch support layered over ``daplug_core.publisher``."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List
+
+import boto3
+import simplejson as json
+from daplug_core import logger
+from daplug_core import publisher as core_publisher
+
+SNS_BATCH_LIMIT = 10
+SNS_BATCH_MAX_BYTES = 256 * 1024
+
+
+def publish(**kwargs: Any) -> None:
+    core_publisher.publish(**kwargs)
+
+
+def publish_batch(**kwargs: Any) -> None:
+    entries: List[Dict[str, Any]] = [entry for entry in kwargs.get("entries", []) if entry.get("data")]
+    if not kwargs.get("arn") or not entries:
+        return
+    try:
+        sns_client = boto3.client(
+            "sns", region_name=kwargs.get("region"), endpoint_url=kwargs.get("endpoint")
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.log(level="WARN", log={"error": f"publish_sns_batch_error: {exc}"})
+        return
+    for chunk in _chunks(_batch_entries(entries)):
+        try:
+            response = sns_client.publish_batch(TopicArn=kwargs["arn"], PublishBatchRequestEntries=chunk)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.log(level="WARN", log={"error": f"publish_sns_batch_error: {exc}"})
+            continue
+        if response.get("Failed"):
+            logger.log(level="WARN", log={"error": "publish_sns_batch_failed", "failed": response["Failed"]})
+
+
+def _batch_entries(entries: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for index, entry in enumerate(entries):
+        try:
+            batch_entry = _batch_entry(str(index), entry)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.log(level="WARN", log={"error": f"publish_sns_batch_entry_error: {exc}"})
+            continue
+        yield batch_entry
+
+
+def _chunks(batch_entries: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    chunk_bytes = 0
+    for batch_entry in batch_entries:
+        entry_bytes = _entry_size(batch_entry)
+        if chunk and (len(chunk) == SNS_BATCH_LIMIT or chunk_bytes + entry_bytes > SNS_BATCH_MAX_BYTES):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(batch_entry)
+        chunk_bytes += entry_bytes
+    if chunk:
+        yield chunk
+
+
+def _entry_size(batch_entry: Dict[str, Any]) -> int:
+    size = len(batch_entry["Message"].encode("utf-8"))
+    for name, attribute in batch_entry["MessageAttributes"].items():
+        size += len(name.encode("utf-8")) + len(attribute.get("DataType", "").encode("utf-8"))
+        size += len(str(attribute.get("StringValue", "")).encode("utf-8"))
+    return size
+
+
+def _batch_entry(entry_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    batch_entry: Dict[str, Any] = {
+        "Id": entry_id,
+        "Message": json.dumps(entry["data"]),
+        "MessageAttributes": entry.get("attributes", {}),
+    }
+    if entry.get("fifo_group_id"):
+        batch_entry["MessageGroupId"] = entry["fifo_group_id"]
+    if entry.get("fifo_duplication_id"):
+        batch_entry["MessageDeduplicationId"] = entry["fifo_duplication_id"]
+    return batch_entry
@@ -3,11 +3,16 @@ from __future__ import annotations
 from typing import Any, Dict, Optional, TypedDict
 from typing import Literal
 
+from neo4j import Driver
+
+from daplug_core.types import PublisherProtocol
+
 
 class AdapterSerializationOptions(TypedDict, total=False):
     node_label: Optional[str]
     serialize: bool
     search: bool
+    materialize: bool
 
 
 class SerializeRecordsOptions(TypedDict, total=False):
@@ -39,9 +44,11 @@ class AdapterConfig(TypedDict, total=False):
     schema: str
     validate_schema: bool
     driver_config: Dict[str, Any]
+    driver: Driver
     sns_arn: str
     sns_endpoint: str
     sns_attributes: Dict[str, Any]
+    publisher: PublisherProtocol
 
 
 class _CreateParamsRequired(TypedDict):
@@ -67,6 +74,7 @@ class ReadParams(_ReadParamsRequired, total=False):
     label: str
     serialize: bool
     search: bool
+    materialize: bool
 
 
 class _QueryParamsRequired(TypedDict):
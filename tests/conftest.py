@@ -2,30 +2,57 @@
 
 from __future__ import annotations
 
+import functools
+import json
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pytest
-from neo4j import GraphDatabase
+from filelock import FileLock
+
+if TYPE_CHECKING:
+    from neo4j import Driver
 
 # Ensure project root is importable when running pytest directly.
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-if str(PROJECT_ROOT) not in sys.path:
+if PROJECT_ROOT not in map(Path, sys.path):
     sys.path.insert(0, str(PROJECT_ROOT))
 
-_DEFAULT_SETTINGS = {
-    "url": "bolt://localhost:7687",
-    "user": "neo4j",
-    "password": "password",
-}
+INTEGRATION_DIR = PROJECT_ROOT / "tests" / "integrations"
+
+# (url, user, password)
+_DEFAULT_SETTINGS = ("bolt://localhost:7687", "neo4j", "password")
+
+
+def _check_unique_module_names(paths: Iterable[Path]) -> None:
+    # Same-named test modules under different directories both collect, so a copied file would run twice.
+    modules: Dict[str, Path] = {}
+    for path in paths:
+        first = modules.setdefault(path.name, path)
+        if first != path:
+            raise pytest.UsageError(f"duplicate test module name {path.name}: {first} and {path}")
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    # xdist workers leave the check to the controller, which reports it without an INTERNALERROR traceback.
+    if not hasattr(session.config, "workerinput"):
+        _check_unique_module_names(item.path for item in session.items)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_node_collection_finished(node: Any, ids: List[str]) -> None:
+    rootpath = node.config.rootpath
+    _check_unique_module_names(rootpath / node_id.split("::", 1)[0] for node_id in ids)
 
 
-def _build_settings(prefix: str, fallback: Dict[str, str]) -> Dict[str, Any]:
-    url = os.getenv(f"{prefix}_BOLT_URL", fallback["url"])
-    user = os.getenv(f"{prefix}_USER", fallback["user"])
-    password = os.getenv(f"{prefix}_PASSWORD", fallback["password"])
+@functools.lru_cache(maxsize=None)
+def _build_settings(prefix: str, fallback: Tuple[str, str, str]) -> Dict[str, Any]:
+    fallback_url, fallback_user, fallback_password = fallback
+    url = os.getenv(f"{prefix}_BOLT_URL", fallback_url)
+    user = os.getenv(f"{prefix}_USER", fallback_user)
+    password = os.getenv(f"{prefix}_PASSWORD", fallback_password)
     auth: Optional[Tuple[str, Optional[str]]] = None
     if user:
         auth = (user, password)
@@ -37,32 +64,115 @@ def _build_settings(prefix: str, fallback: Dict[str, str]) -> Dict[str, Any]:
     }
 
 
-def _ensure_connection(settings: Dict[str, Any], label: str) -> None:
-    auth = settings.get("auth")
-    driver = GraphDatabase.driver(settings["url"], auth=auth) if auth else GraphDatabase.driver(settings["url"])
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        default=False,
+        help="collect the Neo4j/Neptune integration suites under tests/integrations",
+    )
+
+
+def pytest_ignore_collect(collection_path: Path, config: pytest.Config) -> Optional[bool]:
+    if config.getoption("--run-integration"):
+        return None
+    if collection_path == INTEGRATION_DIR or INTEGRATION_DIR in collection_path.parents:
+        return True
+    return None
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    if os.getenv("NEO4J_BOLT_URL"):
+        return
+    skip = pytest.mark.skip(reason="NEO4J_BOLT_URL unset")
+    for item in items:
+        if "neo4j" in item.keywords or "neptune" in item.keywords:
+            item.add_marker(skip)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_driver(url: str, user: Optional[str], password: Optional[str]) -> Driver:
+    from neo4j import GraphDatabase  # pylint: disable=import-outside-toplevel
+
+    auth = (user, password) if user else None
+    return GraphDatabase.driver(
+        url,
+        auth=auth,
+        max_connection_pool_size=50,
+        connection_acquisition_timeout=30,
+    )
+
+
+def _graph_driver(settings: Dict[str, Any]) -> Driver:
+    return _cached_driver(settings["url"], settings["user"], settings["password"])
+
+
+def _probe_connection(settings: Dict[str, Any]) -> Dict[str, Any]:
+    driver = _graph_driver(settings)
     try:
         with driver.session() as session:
             session.run("RETURN 1").consume()
     except Exception as exc:  # pragma: no cover - defensive guard
-        pytest.skip(f"{label} endpoint unavailable at {settings['url']}: {exc}")
-    finally:
-        driver.close()
+        return {"ok": False, "error": str(exc)}
+    return {"ok": True}
+
+
+def _ensure_connection(settings: Dict[str, Any], label: str, tmp_path_factory: pytest.TempPathFactory) -> None:
+    # Under pytest-xdist only the first worker probes; the rest reuse its cached outcome.
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        root_tmp_dir = tmp_path_factory.getbasetemp().parent
+        probe_file = root_tmp_dir / f"{label.lower()}_probe.json"
+        with FileLock(f"{probe_file}.lock"):
+            if probe_file.is_file():
+                outcome = json.loads(probe_file.read_text())
+            else:
+                outcome = _probe_connection(settings)
+                probe_file.write_text(json.dumps(outcome))
+    else:
+        outcome = _probe_connection(settings)
+    if not outcome["ok"]:
+        pytest.skip(f"{label} endpoint unavailable at {settings['url']}: {outcome['error']}")
 
 
 @pytest.fixture(scope="session")
-def neo4j_connection_settings() -> Dict[str, Any]:
+def neo4j_connection_settings(tmp_path_factory: pytest.TempPathFactory) -> Dict[str, Any]:
+    if not os.getenv("NEO4J_BOLT_URL"):
+        pytest.skip("NEO4J_BOLT_URL unset")
     settings = _build_settings("NEO4J", _DEFAULT_SETTINGS)
-    _ensure_connection(settings, "Neo4j")
+    _ensure_connection(settings, "Neo4j", tmp_path_factory)
     return settings
 
 
 @pytest.fixture(scope="session")
-def neptune_connection_settings(neo4j_connection_settings: Dict[str, Any]) -> Dict[str, Any]:
-    fallback = {
-        "url": neo4j_connection_settings["url"],
-        "user": neo4j_connection_settings["user"],
-        "password": neo4j_connection_settings["password"],
-    }
+def neptune_connection_settings(
+    neo4j_connection_settings: Dict[str, Any],
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Dict[str, Any]:
+    fallback = (
+        neo4j_connection_settings["url"],
+        neo4j_connection_settings["user"],
+        neo4j_connection_settings["password"],
+    )
     settings = _build_settings("NEPTUNE", fallback)
-    _ensure_connection(settings, "Neptune")
+    _ensure_connection(settings, "Neptune", tmp_path_factory)
     return settings
+
+
+@pytest.fixture(scope="session")
+def neo4j_driver(neo4j_connection_settings: Dict[str, Any]) -> Iterator[Driver]:
+    driver = _graph_driver(neo4j_connection_settings)
+    yield driver
+    driver.close()
+
+
+@pytest.fixture(scope="session")
+def neptune_driver(neptune_connection_settings: Dict[str, Any]) -> Iterator[Driver]:
+    driver = _graph_driver(neptune_connection_settings)
+    yield driver
+    driver.close()
+
+
+@pytest.fixture(scope="session")
+def worker_label_suffix(request: pytest.FixtureRequest) -> str:
+    workerinput = getattr(request.config, "workerinput", None)
+    return workerinput["workerid"] if workerinput else ""
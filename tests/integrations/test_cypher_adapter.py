@@ -1,223 +1,202 @@
 from __future__ import annotations
 
+import itertools
 import uuid
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator
 
 import pytest
-from neo4j import GraphDatabase
 
-from daplug_cypher import adapter as build_adapter
+pytest.importorskip("neo4j", reason="neo4j driver not installed")
+
+from daplug_cypher import adapter as build_adapter  # noqa: E402  pylint: disable=wrong-import-position
+from daplug_cypher.adapter import CypherAdapter  # noqa: E402  pylint: disable=wrong-import-position
+
+if TYPE_CHECKING:
+    from neo4j import Driver
 
 NEO4J_LABEL = "Neo4jIntegrationNode"
 NEPTUNE_LABEL = "NeptuneIntegrationNode"
 
+# Test ids only need to be unique per run, so one uuid per process plus a counter suffices.
+_RUN_ID = uuid.uuid4().hex
+_SEQUENCE = itertools.count()
+
+# Labels stay in the query text so the planner can use a label scan; only values travel as parameters.
+READ_BY_TEST_ID = "MATCH (n:{label}) WHERE n.test_id = $test_id RETURN n"
+CREATE_RELATIONSHIP = (
+    "MATCH (a:{label}), (b:{label}) "
+    "WHERE a.test_id = $source AND b.test_id = $target "
+    "CREATE (a)-[:ASSOCIATED_WITH]->(b) RETURN a,b"
+)
+DELETE_RELATIONSHIP = (
+    "MATCH (a:{label})-[r:ASSOCIATED_WITH]->(b:{label}) "
+    "WHERE a.test_id = $source AND b.test_id = $target "
+    "DETACH DELETE r"
+)
+READ_RELATIONSHIP = (
+    "MATCH (a:{label})-[r:ASSOCIATED_WITH]->(b:{label}) "
+    "WHERE a.test_id = $source AND b.test_id = $target "
+    "RETURN r"
+)
+UNPARAMETERIZED_QUERY = "MATCH (n) RETURN n"
+UNREACHABLE_BOLT_URL = "bolt://bolt-settings-must-lose.invalid:7687"
+
+
+def _worker_label(base: str, suffix: str) -> str:
+    return f"{base}_{suffix}" if suffix else base
+
+
+@pytest.fixture(scope="session")
+def neo4j_label(worker_label_suffix: str) -> str:
+    return _worker_label(NEO4J_LABEL, worker_label_suffix)
+
 
-def _graph_driver(settings: Dict[str, Any]):
-    auth = settings.get("auth")
-    return GraphDatabase.driver(settings["url"], auth=auth) if auth else GraphDatabase.driver(settings["url"])
+@pytest.fixture(scope="session")
+def neptune_label(worker_label_suffix: str) -> str:
+    return _worker_label(NEPTUNE_LABEL, worker_label_suffix)
 
 
-def _clear_label(settings: Dict[str, Any], label: str) -> None:
-    driver = _graph_driver(settings)
-    try:
-        with driver.session() as session:
-            session.run(f"MATCH (n:{label}) DETACH DELETE n")
-    finally:
-        driver.close()
+def _clear_label(driver: Driver, label: str, batched: bool = False) -> None:
+    query = f"MATCH (n:{label}) DETACH DELETE n"
+    if batched:
+        # Neo4j-only syntax; it needs an auto-commit transaction, hence session.run.
+        query = f"CALL {{ {query} }} IN TRANSACTIONS OF 1000 ROWS"
+    with driver.session() as session:
+        session.run(query).consume()
+
+
+@pytest.fixture
+def neo4j_cleanup(neo4j_driver: Driver, neo4j_label: str) -> Iterator[None]:
+    yield
+    _clear_label(neo4j_driver, neo4j_label, batched=True)
+
+
+@pytest.fixture
+def neptune_cleanup(neptune_driver: Driver, neptune_label: str) -> Iterator[None]:
+    yield
+    _clear_label(neptune_driver, neptune_label)
 
 
 def _build_payload() -> Dict[str, Any]:
     return {
-        "test_id": str(uuid.uuid4()),
+        "test_id": f"{_RUN_ID}_{next(_SEQUENCE)}",
         "version": 1,
         "value": "alpha",
     }
 
 
-def _build_adapter_instance(settings: Dict[str, Any], *, use_neptune: bool) -> Any:
-    connection = {
-        "url": settings["url"],
-        "user": settings["user"],
-        "password": settings["password"],
-    }
-    kwargs: Dict[str, Any] = {
-        "bolt": connection,
-    }
-    if use_neptune:
-        kwargs["neptune"] = connection
-    return build_adapter(**kwargs)
-
-
-def _assert_create_and_read(settings: Dict[str, Any], label: str, *, use_neptune: bool) -> None:
-    _clear_label(settings, label)
-    adapter = _build_adapter_instance(settings, use_neptune=use_neptune)
-    try:
-        payload = _build_payload()
-        created = adapter.create(data=payload, node=label)
-        assert created == payload
-
-        read_result = adapter.read(
-            query=f"MATCH (n:{label}) WHERE n.test_id = $test_id RETURN n",
-            placeholder={"test_id": payload["test_id"]},
-            node=label,
-        )
-        records = read_result.get(label, [])
-        assert records and records[0]["value"] == payload["value"]
-    finally:
-        adapter.close()
-        _clear_label(settings, label)
-
-
-def _assert_update_flow(settings: Dict[str, Any], label: str, *, use_neptune: bool) -> None:
-    _clear_label(settings, label)
-    adapter = _build_adapter_instance(settings, use_neptune=use_neptune)
-    try:
-        payload = _build_payload()
-        adapter.create(data=payload, node=label)
-
-        updated = adapter.update(
-            data={"version": 2, "value": "beta"},
-            query=f"MATCH (n:{label}) WHERE n.test_id = $test_id RETURN n",
-            placeholder={"test_id": payload["test_id"]},
-            original_idempotence_value=payload["version"],
-            node=label,
-            identifier="test_id",
-            idempotence_key="version",
-        )
-        assert updated["version"] == 2
-        assert updated["value"] == "beta"
-
-        reread = adapter.read(
-            query=f"MATCH (n:{label}) WHERE n.test_id = $test_id RETURN n",
-            placeholder={"test_id": payload["test_id"]},
-            node=label,
-        )
-        records = reread.get(label, [])
-        assert records and records[0]["value"] == "beta"
-    finally:
-        adapter.close()
-        _clear_label(settings, label)
-
-
-def _assert_delete_flow(settings: Dict[str, Any], label: str, *, use_neptune: bool) -> None:
-    _clear_label(settings, label)
-    adapter = _build_adapter_instance(settings, use_neptune=use_neptune)
-    try:
-        payload = _build_payload()
-        adapter.create(data=payload, node=label)
-
-        removed = adapter.delete(delete_identifier=payload["test_id"], node=label, identifier="test_id")
-        assert removed["test_id"] == payload["test_id"]
-
-        reread = adapter.read(
-            query=f"MATCH (n:{label}) WHERE n.test_id = $test_id RETURN n",
-            placeholder={"test_id": payload["test_id"]},
-            node=label,
-        )
-        assert reread.get(label, []) == []
-    finally:
-        adapter.close()
-        _clear_label(settings, label)
-
-
-def _assert_relationship_flow(settings: Dict[str, Any], label: str, *, use_neptune: bool) -> None:
-    _clear_label(settings, label)
-    adapter = _build_adapter_instance(settings, use_neptune=use_neptune)
-    try:
-        a_payload = _build_payload()
-        b_payload = _build_payload()
-        adapter.create(data=a_payload, node=label)
-        adapter.create(data=b_payload, node=label)
-
-        create_result = adapter.create_relationship(
-            query=(
-                f"MATCH (a:{label}), (b:{label}) "
-                "WHERE a.test_id = $source AND b.test_id = $target "
-                "CREATE (a)-[:ASSOCIATED_WITH]->(b) RETURN a,b"
-            ),
-            placeholder={"source": a_payload["test_id"], "target": b_payload["test_id"]},
-        )
-        assert create_result
-
-        adapter.delete_relationship(
-            query=(
-                f"MATCH (a:{label})-[r:ASSOCIATED_WITH]->(b:{label}) "
-                "WHERE a.test_id = $source AND b.test_id = $target "
-                "DETACH DELETE r"
-            ),
-            placeholder={"source": a_payload["test_id"], "target": b_payload["test_id"]},
-        )
-
-        check = adapter.query(
-            query=(
-                f"MATCH (a:{label})-[r:ASSOCIATED_WITH]->(b:{label}) "
-                "WHERE a.test_id = $source AND b.test_id = $target "
-                "RETURN r"
-            ),
-            placeholder={"source": a_payload["test_id"], "target": b_payload["test_id"]},
-        )
-        assert list(check) == []
-    finally:
-        adapter.close()
-        _clear_label(settings, label)
-
-
-def _assert_query_validation(settings: Dict[str, Any], label: str, *, use_neptune: bool) -> None:
-    _clear_label(settings, label)
-    adapter = _build_adapter_instance(settings, use_neptune=use_neptune)
-    try:
-        with pytest.raises(ValueError):
-            adapter.query(query=f"MATCH (n:{label}) RETURN n")
-    finally:
-        adapter.close()
-        _clear_label(settings, label)
+@pytest.fixture(scope="module")
+def neo4j_adapter(neo4j_driver: Driver) -> Iterator[Any]:
+    adapter = build_adapter(driver=neo4j_driver)
+    yield adapter
+    adapter.close()
 
 
-@pytest.mark.neo4j
-def test_neo4j_create_and_read(neo4j_connection_settings: Dict[str, Any]) -> None:
-    _assert_create_and_read(neo4j_connection_settings, NEO4J_LABEL, use_neptune=False)
+@pytest.fixture(scope="module")
+def neptune_adapter(neptune_connection_settings: Dict[str, Any]) -> Iterator[Any]:
+    # Built from settings rather than an injected driver, so config resolution and the driver pool run end
+    # to end. The unreachable bolt endpoint only works if the neptune settings win.
+    connection = {key: neptune_connection_settings[key] for key in ("url", "user", "password")}
+    adapter = build_adapter(bolt={**connection, "url": UNREACHABLE_BOLT_URL}, neptune=connection)
+    yield adapter
+    adapter.close()
+    CypherAdapter.shutdown_pool()
 
 
-@pytest.mark.neo4j
-def test_neo4j_update_flow(neo4j_connection_settings: Dict[str, Any]) -> None:
-    _assert_update_flow(neo4j_connection_settings, NEO4J_LABEL, use_neptune=False)
+def _create_and_read_flow(adapter: Any, label: str) -> None:
+    payload = _build_payload()
+    created = adapter.create(data=payload, node=label)
+    assert created == payload
 
+    read_result = adapter.read(
+        query=READ_BY_TEST_ID.format(label=label),
+        placeholder={"test_id": payload["test_id"]},
+        node=label,
+    )
+    records = read_result.get(label, [])
+    assert records and records[0]["value"] == payload["value"]
 
-@pytest.mark.neo4j
-def test_neo4j_delete_flow(neo4j_connection_settings: Dict[str, Any]) -> None:
-    _assert_delete_flow(neo4j_connection_settings, NEO4J_LABEL, use_neptune=False)
 
+def _update_flow(adapter: Any, label: str) -> None:
+    payload = _build_payload()
+    adapter.create(data=payload, node=label)
 
-@pytest.mark.neo4j
-def test_neo4j_relationship_flow(neo4j_connection_settings: Dict[str, Any]) -> None:
-    _assert_relationship_flow(neo4j_connection_settings, NEO4J_LABEL, use_neptune=False)
+    updated = adapter.update(
+        data={"version": 2, "value": "beta"},
+        query=READ_BY_TEST_ID.format(label=label),
+        placeholder={"test_id": payload["test_id"]},
+        original_idempotence_value=payload["version"],
+        node=label,
+        identifier="test_id",
+        idempotence_key="version",
+    )
+    assert updated["version"] == 2
+    assert updated["value"] == "beta"
 
+    reread = adapter.read(
+        query=READ_BY_TEST_ID.format(label=label),
+        placeholder={"test_id": payload["test_id"]},
+        node=label,
+    )
+    records = reread.get(label, [])
+    assert records and records[0]["value"] == "beta"
 
-@pytest.mark.neo4j
-def test_neo4j_query_validation(neo4j_connection_settings: Dict[str, Any]) -> None:
-    _assert_query_validation(neo4j_connection_settings, NEO4J_LABEL, use_neptune=False)
 
+def _delete_flow(adapter: Any, label: str) -> None:
+    payload = _build_payload()
+    adapter.create(data=payload, node=label)
 
-@pytest.mark.neptune
-def test_neptune_create_and_read(neptune_connection_settings: Dict[str, Any]) -> None:
-    _assert_create_and_read(neptune_connection_settings, NEPTUNE_LABEL, use_neptune=True)
+    removed = adapter.delete(delete_identifier=payload["test_id"], node=label, identifier="test_id")
+    assert removed["test_id"] == payload["test_id"]
 
+    reread = adapter.read(
+        query=READ_BY_TEST_ID.format(label=label),
+        placeholder={"test_id": payload["test_id"]},
+        node=label,
+    )
+    assert reread.get(label, []) == []
 
-@pytest.mark.neptune
-def test_neptune_update_flow(neptune_connection_settings: Dict[str, Any]) -> None:
-    _assert_update_flow(neptune_connection_settings, NEPTUNE_LABEL, use_neptune=True)
 
+def _relationship_flow(adapter: Any, label: str) -> None:
+    a_payload = _build_payload()
+    b_payload = _build_payload()
+    adapter.create(data=a_payload, node=label)
+    adapter.create(data=b_payload, node=label)
 
-@pytest.mark.neptune
-def test_neptune_delete_flow(neptune_connection_settings: Dict[str, Any]) -> None:
-    _assert_delete_flow(neptune_connection_settings, NEPTUNE_LABEL, use_neptune=True)
+    placeholder = {"source": a_payload["test_id"], "target": b_payload["test_id"]}
 
+    create_result = adapter.create_relationship(query=CREATE_RELATIONSHIP.format(label=label), placeholder=placeholder)
+    assert create_result
 
-@pytest.mark.neptune
-def test_neptune_relationship_flow(neptune_connection_settings: Dict[str, Any]) -> None:
-    _assert_relationship_flow(neptune_connection_settings, NEPTUNE_LABEL, use_neptune=True)
+    adapter.delete_relationship(query=DELETE_RELATIONSHIP.format(label=label), placeholder=placeholder)
+
+    check = adapter.query(query=READ_RELATIONSHIP.format(label=label), placeholder=placeholder)
+    assert list(check) == []
+
+
+def _query_validation_flow(adapter: Any, _label: str) -> None:
+    with pytest.raises(ValueError):
+        adapter.query(query=UNPARAMETERIZED_QUERY)
+
+
+FLOWS: Dict[str, Callable[[Any, str], None]] = {
+    "create_read": _create_and_read_flow,
+    "update": _update_flow,
+    "delete": _delete_flow,
+    "relationship": _relationship_flow,
+    "validation": _query_validation_flow,
+}
+
+
+@pytest.mark.neo4j
+@pytest.mark.usefixtures("neo4j_cleanup")
+@pytest.mark.parametrize("flow", list(FLOWS))
+def test_neo4j_flow(flow: str, neo4j_adapter: Any, neo4j_label: str) -> None:
+    FLOWS[flow](neo4j_adapter, neo4j_label)
 
 
 @pytest.mark.neptune
-def test_neptune_query_validation(neptune_connection_settings: Dict[str, Any]) -> None:
-    _assert_query_validation(neptune_connection_settings, NEPTUNE_LABEL, use_neptune=True)
+@pytest.mark.usefixtures("neptune_cleanup")
+@pytest.mark.parametrize("flow", list(FLOWS))
+def test_neptune_flow(flow: str, neptune_adapter: Any, neptune_label: str) -> None:
+    FLOWS[flow](neptune_adapter, neptune_label)
@@ -0,0 +1,125 @@
+"""Shared fixtures for unit tests."""
+
+from __future__ import annotations
+
+import copy
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import pytest
+from neo4j import Driver, Session, Transaction
+
+from daplug_cypher.adapter import CypherAdapter
+
+
+@pytest.fixture(autouse=True)
+def reset_driver_pool() -> Iterator[None]:
+    # The pool is a class attribute, so each xdist worker process owns its own;
+    # clearing on both sides keeps tests within one worker independent too.
+    CypherAdapter.shutdown_pool()
+    yield
+    CypherAdapter.shutdown_pool()
+
+
+class RecordingSession:
+    """Minimal session double that records queries instead of spawning child mocks."""
+
+    def __init__(self) -> None:
+        self.runs: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        self.closed = False
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        self.runs.append((query, parameters))
+        return []
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def recording_session() -> RecordingSession:
+    return RecordingSession()
+
+
+@pytest.fixture(scope="session")
+def _session_spec() -> mock.NonCallableMagicMock:
+    return mock.create_autospec(Session, instance=True, spec_set=True)
+
+
+@pytest.fixture(scope="session")
+def _transaction_spec() -> mock.NonCallableMagicMock:
+    return mock.create_autospec(Transaction, instance=True, spec_set=True)
+
+
+@pytest.fixture(scope="session")
+def _driver_spec() -> mock.NonCallableMagicMock:
+    return mock.create_autospec(Driver, instance=True, spec_set=True)
+
+
+@pytest.fixture
+def neo4j_session(_session_spec: mock.NonCallableMagicMock) -> mock.NonCallableMagicMock:
+    _session_spec.reset_mock(return_value=True, side_effect=True)
+    return _session_spec
+
+
+@pytest.fixture
+def neo4j_tx(_transaction_spec: mock.NonCallableMagicMock) -> mock.NonCallableMagicMock:
+    _transaction_spec.reset_mock(return_value=True, side_effect=True)
+    return _transaction_spec
+
+
+@pytest.fixture
+def mock_driver(
+    _driver_spec: mock.NonCallableMagicMock, neo4j_session: mock.NonCallableMagicMock
+) -> mock.NonCallableMagicMock:
+    _driver_spec.reset_mock(return_value=True, side_effect=True)
+    _driver_spec.session.return_value = neo4j_session
+    return _driver_spec
+
+
+@pytest.fixture
+def adapter() -> CypherAdapter:
+    return CypherAdapter(auto_connect=False, bolt={"url": "bolt://unit", "user": "neo"})
+
+
+_STUB_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "map_with_schema": {"side_effect": lambda data: dict(data)},
+    "default_create_query": {"return_value": "CREATE (n:Unit) SET n = $placeholder RETURN n"},
+    "execute_write": {},
+    "extract_publish_options": {"return_value": {}},
+    "extract_read_before_delete_options": {"return_value": {}},
+    "publish_with_operation": {},
+    "match": {"return_value": {}},
+    "clean_placeholders": {"return_value": {}},
+    "run_read": {"return_value": ["row"]},
+    "extract_merge_options": {"return_value": {}},
+    "merge_payload": {},
+    "default_update_query": {"return_value": "MATCH (n:Unit) RETURN n"},
+    "map_with_schema_update": {},
+    "get_before_delete": {"return_value": {}},
+    "perform_delete": {},
+    "run_write": {"return_value": ["result"]},
+    "first_node": {},
+}
+
+
+@pytest.fixture(scope="session")
+def _stub_support_prototype() -> SimpleNamespace:
+    return SimpleNamespace(**{name: mock.Mock() for name in _STUB_DEFAULTS})
+
+
+@pytest.fixture
+def stub_support(_stub_support_prototype: SimpleNamespace) -> Callable[..., SimpleNamespace]:
+    for name, defaults in _STUB_DEFAULTS.items():
+        method = getattr(_stub_support_prototype, name)
+        method.reset_mock(return_value=True, side_effect=True)
+        method.configure_mock(**defaults)
+
+    def build(**overrides: Any) -> SimpleNamespace:
+        stub = copy.copy(_stub_support_prototype)
+        for key, value in overrides.items():
+            setattr(stub, key, value)
+        return stub
+
+    return build
@@ -0,0 +1,28 @@
+"""Unit tests for the cached default Cypher statements."""
+
+from __future__ import annotations
+
+from daplug_cypher.cypher import queries
+
+
+def test_default_queries_only_use_parameters_for_values() -> None:
+    assert queries.create_query("Unit") == "CREATE (n:Unit) SET n = $placeholder RETURN n"
+    assert queries.update_query("Unit", "test_id", "updated_at") == (
+        "MATCH (n:Unit) WHERE n.test_id = $id AND n.updated_at = $version SET n = $placeholder RETURN n"
+    )
+    assert queries.read_before_delete_query("Unit", "test_id") == (
+        "MATCH (n:Unit) WHERE n.test_id = $id RETURN n LIMIT 1"
+    )
+    assert queries.delete_query("Unit", "test_id") == (
+        "MATCH (n:Unit) WHERE n.test_id = $id WITH n LIMIT 1 DETACH DELETE n"
+    )
+
+
+def test_default_queries_are_built_once_per_key() -> None:
+    queries.update_query.cache_clear()
+
+    first = queries.update_query("Unit", "test_id", "updated_at")
+    second = queries.update_query("Unit", "test_id", "updated_at")
+
+    assert first is second
+    assert queries.update_query.cache_info().misses == 1
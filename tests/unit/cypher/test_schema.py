@@ -0,0 +1,98 @@
+"""Unit tests for cached schema projection."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from daplug_core.schema_mapper import map_to_schema
+from pytest_mock import MockerFixture
+
+from daplug_cypher.cypher import schema as schema_module
+from daplug_cypher.cypher.schema import map_with_cached_schema
+
+pytestmark = pytest.mark.slow
+
+SCHEMA = """
+components:
+  schemas:
+    Base:
+      type: object
+      properties:
+        id:
+          type: string
+    Customer:
+      allOf:
+        - $ref: '#/components/schemas/Base'
+        - type: object
+          properties:
+            name:
+              type: string
+            address:
+              type: object
+              properties:
+                city:
+                  type: string
+            orders:
+              type: array
+              items:
+                type: object
+                properties:
+                  order_id:
+                    type: string
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_schema_cache() -> Iterator[None]:
+    schema_module._compiled_fields.cache_clear()
+    yield
+    schema_module._compiled_fields.cache_clear()
+
+
+@pytest.fixture
+def schema_file(tmp_path: Path) -> Path:
+    path = tmp_path / "openapi.yml"
+    path.write_text(SCHEMA)
+    return path
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {
+            "id": "c-1",
+            "name": "Ada",
+            "extra": True,
+            "address": {"city": "Paris", "zip": "75001"},
+            "orders": [{"order_id": "o-1", "total": 5}, {"order_id": "o-2"}],
+        },
+        {"id": "c-2", "address": "not-a-dict", "orders": "not-a-list"},
+        {"name": "Ada"},
+        {"name": "Ada", "orders": ["not-a-dict", {"order_id": "o-3"}]},
+        {},
+    ],
+)
+def test_map_with_cached_schema_matches_core_mapper(schema_file: Path, data: dict) -> None:
+    assert map_with_cached_schema(data, str(schema_file), "Customer") == map_to_schema(
+        data, str(schema_file), "Customer"
+    )
+
+
+def test_map_with_cached_schema_loads_file_once(schema_file: Path, mocker: MockerFixture) -> None:
+    load_mock = mocker.patch.object(schema_module.yaml, "load", wraps=schema_module.yaml.load)
+    map_with_cached_schema({"id": "1"}, str(schema_file), "Customer")
+    map_with_cached_schema({"id": "2"}, str(schema_file), "Customer")
+    load_mock.assert_called_once_with(mocker.ANY, Loader=schema_module._YamlLoader)
+
+
+def test_map_with_cached_schema_reloads_when_file_changes(schema_file: Path) -> None:
+    assert map_with_cached_schema({"id": "1"}, str(schema_file), "Base") == {"id": "1"}
+
+    schema_file.write_text(SCHEMA.replace("        id:\n", "        key:\n", 1))
+    stat = schema_file.stat()
+    os.utime(schema_file, (stat.st_atime, stat.st_mtime + 10))
+
+    assert map_with_cached_schema({"id": "1", "key": "k"}, str(schema_file), "Base") == {"key": "k"}
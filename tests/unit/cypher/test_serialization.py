@@ -53,11 +53,11 @@ class FakePath:
         self.relationships = relationships
 
 
-@pytest.fixture(autouse=True)
-def patch_classes(monkeypatch) -> None:
-    monkeypatch.setattr(serialization, "Node", FakeNode)
-    monkeypatch.setattr(serialization, "Relationship", FakeRelationship)
-    monkeypatch.setattr(serialization, "Path", FakePath)
+@pytest.fixture(autouse=True, scope="module")
+def patch_classes(module_mocker) -> None:
+    module_mocker.patch.object(serialization, "Node", FakeNode)
+    module_mocker.patch.object(serialization, "Relationship", FakeRelationship)
+    module_mocker.patch.object(serialization, "Path", FakePath)
 
 
 def test_serialize_records_nodes_only() -> None:
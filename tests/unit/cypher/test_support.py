@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
+import contextvars
+import threading
 from pathlib import Path
 from typing import Any
-from unittest import mock
 
 import pytest
 
 from daplug_cypher.cypher.support import SupportUtilities
 
 
+SNS_ORIGIN_API = {"origin": "api"}
+SNS_SOURCE_TEST = {"source": "test"}
+
+
 class DummyAdapter:
     def __init__(self) -> None:
         self.schema_file = None
@@ -18,13 +23,18 @@ class DummyAdapter:
         self.neptune = None
         self.bolt = {"url": "bolt://dummy", "user": "neo"}
         self._session = None
+        self.auto_connect = True
         self.published: list[tuple[Any, dict[str, Any]]] = []
+        self.published_batches: list[list[tuple[Any, dict[str, Any]]]] = []
         self.auto_open_calls = 0
         self.auto_close_calls = 0
 
     def publish(self, payload: Any, **kwargs: Any) -> None:  # pragma: no cover - trivial shim
         self.published.append((payload, kwargs))
 
+    def publish_batch(self, items: list[tuple[Any, dict[str, Any]]]) -> None:
+        self.published_batches.append(items)
+
     def _auto_open(self) -> None:
         self.auto_open_calls += 1
 
@@ -32,19 +42,42 @@ class DummyAdapter:
         self.auto_close_calls += 1
 
 
-class FakeSession:
-    def __init__(self, *, run_results: list[Any] | None = None) -> None:
-        self.run_results = list(run_results or [])
-        self.run_calls: list[tuple[str, Any]] = []
-        self.write_calls: list[tuple[str, Any]] = []
+SAMPLE_SCHEMA = """
+components:
+  schemas:
+    Model:
+      type: object
+      properties:
+        allowed:
+          type: string
+        nested:
+          type: object
+          properties:
+            value:
+              type: integer
+"""
+
+
+@pytest.fixture(scope="session")
+def sample_schema(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("schemas") / "schema.yml"
+    path.write_text(SAMPLE_SCHEMA)
+    return path
+
+
+@pytest.fixture
+def mock_match(mocker):
+    return mocker.patch.object(SupportUtilities, "match", autospec=True)
 
-    def run(self, query: str, params: Any = None) -> Any:  # pragma: no cover - helper
-        self.run_calls.append((query, params))
-        return self.run_results.pop(0) if self.run_results else []
 
-    def execute_write(self, callback):  # pragma: no cover - helper
-        tx = mock.Mock()
-        return callback(tx)
+@pytest.fixture
+def mock_run_write(mocker):
+    return mocker.patch.object(SupportUtilities, "run_write", autospec=True, return_value=None)
+
+
+@pytest.fixture
+def mock_is_node(mocker):
+    return mocker.patch.object(SupportUtilities, "is_node", autospec=True)
 
 
 def test_extract_publish_options_merges_attributes() -> None:
@@ -52,7 +85,7 @@ def test_extract_publish_options_merges_attributes() -> None:
     support = SupportUtilities(adapter)
     options = support.extract_publish_options(
         {
-            "sns_attributes": {"origin": "api"},
+            "sns_attributes": SNS_ORIGIN_API,
             "fifo_group_id": "group",
             "fifo_duplication_id": "dedupe",
         }
@@ -62,16 +95,77 @@ def test_extract_publish_options_merges_attributes() -> None:
     assert options["fifo_duplication_id"] == "dedupe"
 
 
+def test_extract_publish_options_skips_unset_and_invalid_values() -> None:
+    adapter = DummyAdapter()
+    support = SupportUtilities(adapter)
+    options = support.extract_publish_options(
+        {"sns_attributes": "not-a-dict", "fifo_group_id": None, "fifo_duplication_id": "dedupe", "other": 1}
+    )
+    assert options == {"fifo_duplication_id": "dedupe"}
+
+
 def test_publish_with_operation_invokes_adapter_publish() -> None:
     adapter = DummyAdapter()
     support = SupportUtilities(adapter)
-    support.publish_with_operation("create", {"id": 1}, sns_attributes={"source": "test"})
+    support.publish_with_operation("create", {"id": 1}, sns_attributes=SNS_SOURCE_TEST)
     payload, kwargs = adapter.published[0]
     assert payload == {"id": 1}
     assert kwargs["sns_attributes"]["operation"] == "create"
     assert kwargs["sns_attributes"]["source"] == "test"
 
 
+def test_batched_publish_defers_until_scope_exit() -> None:
+    adapter = DummyAdapter()
+    support = SupportUtilities(adapter)
+    with support.batched_publish():
+        support.publish_with_operation("create", {"id": 1})
+        with support.batched_publish():
+            support.publish_with_operation("delete", {"id": 2}, fifo_group_id="group")
+        assert not adapter.published_batches
+    assert not adapter.published
+    assert adapter.published_batches == [
+        [
+            ({"id": 1}, {"sns_attributes": {"operation": "create"}}),
+            ({"id": 2}, {"sns_attributes": {"operation": "delete"}, "fifo_group_id": "group"}),
+        ]
+    ]
+    support.publish_with_operation("update", {"id": 3})
+    assert adapter.published == [({"id": 3}, {"sns_attributes": {"operation": "update"}})]
+
+
+def test_batched_publish_flushes_when_scope_raises() -> None:
+    adapter = DummyAdapter()
+    support = SupportUtilities(adapter)
+    with pytest.raises(RuntimeError):
+        with support.batched_publish():
+            support.publish_with_operation("create", {"id": 1})
+            raise RuntimeError("boom")
+    assert len(adapter.published_batches) == 1
+
+
+def test_batched_publish_ignores_events_from_other_threads() -> None:
+    adapter = DummyAdapter()
+    support = SupportUtilities(adapter)
+    with support.batched_publish():
+        worker = threading.Thread(target=support.publish_with_operation, args=("create", {"id": 2}))
+        worker.start()
+        worker.join()
+        support.publish_with_operation("create", {"id": 1})
+    assert adapter.published == [({"id": 2}, {"sns_attributes": {"operation": "create"}})]
+    assert adapter.published_batches == [[({"id": 1}, {"sns_attributes": {"operation": "create"}})]]
+
+
+def test_batched_publish_leaves_no_context_state_behind() -> None:
+    def open_batches() -> int:
+        for _ in range(50):
+            support = SupportUtilities(DummyAdapter())
+            with support.batched_publish():
+                support.publish_with_operation("create", {"id": 1})
+        return len(contextvars.copy_context())
+
+    assert contextvars.copy_context().run(open_batches) <= len(contextvars.copy_context()) + 1
+
+
 def test_extract_merge_options_honours_values() -> None:
     adapter = DummyAdapter()
     support = SupportUtilities(adapter)
@@ -105,74 +199,107 @@ def test_execute_write_raises_without_session() -> None:
         support.execute_write(lambda tx: tx)
 
 
-def test_run_read_and_match_invoke_session(monkeypatch) -> None:
+def test_run_read_and_match_invoke_session(neo4j_session) -> None:
     adapter = DummyAdapter()
-    session = FakeSession(run_results=[["record"]])
-    adapter._session = session
+    neo4j_session.run.return_value = ["record"]
+    adapter._session = neo4j_session
     support = SupportUtilities(adapter)
     result = support.match("MATCH () RETURN 1", {"id": "1"}, node_label="Unit", serialize=False, search=False)
     assert result == ["record"]
-    assert session.run_calls[0][0] == "MATCH () RETURN 1"
+    neo4j_session.run.assert_called_once_with("MATCH () RETURN 1", {"id": 1})
 
 
-def test_match_serializes_when_requested(monkeypatch) -> None:
+def test_match_serializes_when_requested(neo4j_session, mocker) -> None:
     adapter = DummyAdapter()
-    session = FakeSession(run_results=[["raw"]])
-    adapter._session = session
+    neo4j_session.run.return_value = ["raw"]
+    adapter._session = neo4j_session
     support = SupportUtilities(adapter)
-    with mock.patch("daplug_cypher.cypher.support.serialize_records", return_value={"Unit": []}) as serialize_mock:
-        payload = support.match("MATCH () RETURN 1", None, node_label="Unit", serialize=True, search=False)
+    serialize_mock = mocker.patch("daplug_cypher.cypher.support.serialize_records", return_value={"Unit": []})
+    payload = support.match("MATCH () RETURN 1", None, node_label="Unit", serialize=True, search=False)
     assert payload == {"Unit": []}
-    serialize_mock.assert_called_once()
+    serialize_mock.assert_called_once_with(["raw"], label="Unit", serialize=True, search=False)
+
+
+def test_match_serializes_result_without_copying_it(neo4j_session, mocker) -> None:
+    adapter = DummyAdapter()
+    result = iter(["raw"])
+    neo4j_session.run.return_value = result
+    adapter._session = neo4j_session
+    support = SupportUtilities(adapter)
+    serialize_mock = mocker.patch("daplug_cypher.cypher.support.serialize_records", return_value={"Unit": []})
+    support.match("MATCH () RETURN 1", None, node_label="Unit")
+    serialize_mock.assert_called_once_with(result, label="Unit", serialize=True, search=False)
+
+
+@pytest.mark.parametrize(
+    ("auto_connect", "materialize", "lazy"),
+    [(True, False, False), (False, True, False), (False, False, True)],
+)
+def test_match_returns_lazy_result_only_when_session_stays_open(
+    neo4j_session, auto_connect: bool, materialize: bool, lazy: bool
+) -> None:
+    adapter = DummyAdapter()
+    adapter.auto_connect = auto_connect
+    result = iter(["record"])
+    neo4j_session.run.return_value = result
+    adapter._session = neo4j_session
+    support = SupportUtilities(adapter)
+    records = support.match("MATCH () RETURN 1", None, serialize=False, materialize=materialize)
+    assert (records is result) is lazy
+    assert list(records) == ["record"]
 
 
-def test_get_before_delete_returns_first_entry() -> None:
+def test_get_before_delete_returns_first_entry(mock_match) -> None:
     adapter = DummyAdapter()
     support = SupportUtilities(adapter)
-    support.match = mock.Mock(return_value={"Unit": [{"id": 1}]})  # type: ignore[assignment]
+    mock_match.return_value = {"Unit": [{"id": 1}]}
     result = support.get_before_delete("Unit", "id", 1)
     assert result == {"id": 1}
+    mock_match.assert_called_once_with(
+        support,
+        "MATCH (n:Unit) WHERE n.id = $id RETURN n LIMIT 1",
+        {"id": 1},
+        node_label="Unit",
+        serialize=True,
+        search=False,
+    )
 
 
-def test_perform_delete_runs_write(monkeypatch) -> None:
+def test_perform_delete_runs_write(neo4j_session, mock_run_write) -> None:
     adapter = DummyAdapter()
-    session = FakeSession()
-    adapter._session = session
+    adapter._session = neo4j_session
     support = SupportUtilities(adapter)
-    support.run_write = mock.Mock(return_value=None)  # type: ignore[assignment]
     support.perform_delete("Unit", "id", 1, None)
-    support.run_write.assert_called_once()
+    mock_run_write.assert_called_once_with(
+        support, "MATCH (n:Unit) WHERE n.id = $id WITH n LIMIT 1 DETACH DELETE n", {"id": 1}
+    )
 
 
-def test_first_node_uses_is_node(monkeypatch) -> None:
+def test_first_node_uses_is_node(mock_is_node, mocker) -> None:
     adapter = DummyAdapter()
     support = SupportUtilities(adapter)
     sentinel = object()
-    support.is_node = lambda value: value is sentinel  # type: ignore[assignment]
-    record = mock.Mock()
+    mock_is_node.side_effect = lambda _self, value: value is sentinel
+    record = mocker.Mock()
     record.values.return_value = [sentinel]
     assert support.first_node(record) is sentinel
 
 
-def test_map_with_schema_with_explicit_schema(tmp_path: Path) -> None:
-    schema = """
-components:
-  schemas:
-    Model:
-      type: object
-      properties:
-        allowed:
-          type: string
-        nested:
-          type: object
-          properties:
-            value:
-              type: integer
-"""
-    path = tmp_path / "schema.yml"
-    path.write_text(schema)
+def test_first_node_prefers_first_column_value(mock_is_node, mocker) -> None:
     adapter = DummyAdapter()
-    adapter.schema_file = str(path)
+    support = SupportUtilities(adapter)
+    sentinel = object()
+    mock_is_node.side_effect = lambda _self, value: value is sentinel
+    record = mocker.Mock()
+    record.value.return_value = sentinel
+    assert support.first_node(record) is sentinel
+    record.values.assert_not_called()
+
+
+@pytest.mark.slow
+def test_map_with_schema_with_explicit_schema(sample_schema: Path) -> None:
+    adapter = DummyAdapter()
+    adapter.schema_file = str(sample_schema)
     adapter.schema_name = "Model"
     support = SupportUtilities(adapter)
     data = {"allowed": "yes", "nested": {"value": 3}, "ignored": True}
@@ -180,48 +307,54 @@ components:
     assert mapped == {"allowed": "yes", "nested": {"value": 3}}
 
 
-def test_execute_write_uses_session_interface() -> None:
+def test_execute_write_uses_session_interface(mocker) -> None:
     adapter = DummyAdapter()
-    session = mock.Mock()
+    session = mocker.Mock()
     adapter._session = session
     support = SupportUtilities(adapter)
-    callback = mock.Mock()
+    callback = mocker.Mock()
     support.execute_write(callback)
     session.execute_write.assert_called_once_with(callback)
 
 
-def test_run_read_with_session() -> None:
+def test_execute_write_falls_back_to_write_transaction(neo4j_session, mocker) -> None:
     adapter = DummyAdapter()
-    session = mock.Mock()
-    adapter._session = session
+    adapter._session = neo4j_session
+    support = SupportUtilities(adapter)
+    callback = mocker.Mock()
+    neo4j_session.write_transaction.return_value = "written"
+    assert support.execute_write(callback) == "written"
+    neo4j_session.write_transaction.assert_called_once_with(callback)
+
+
+def test_run_read_with_session(recording_session) -> None:
+    adapter = DummyAdapter()
+    adapter._session = recording_session
     support = SupportUtilities(adapter)
     support.run_read("MATCH", {"id": 1})
-    session.run.assert_called_once_with("MATCH", {"id": 1})
+    assert recording_session.runs == [("MATCH", {"id": 1})]
 
 
-def test_run_write_with_session() -> None:
+def test_run_write_with_session(recording_session) -> None:
     adapter = DummyAdapter()
-    session = mock.Mock()
-    adapter._session = session
+    adapter._session = recording_session
     support = SupportUtilities(adapter)
     support.run_write("DELETE", {"id": 1})
-    session.run.assert_called_once_with("DELETE", {"id": 1})
+    assert recording_session.runs == [("DELETE", {"id": 1})]
 
 
-def test_get_before_delete_returns_first_list_entry() -> None:
+def test_get_before_delete_returns_first_list_entry(mock_match) -> None:
     adapter = DummyAdapter()
     support = SupportUtilities(adapter)
-    support.match = mock.Mock(return_value=[["first"], ["second"]])  # type: ignore[assignment]
+    mock_match.return_value = [["first"], ["second"]]
     result = support.get_before_delete("Unit", "id", 1)
     assert result == ["first"]
 
 
-def test_perform_delete_opens_and_closes_connection() -> None:
+def test_perform_delete_opens_and_closes_connection(recording_session, mock_run_write) -> None:
     adapter = DummyAdapter()
-    session = mock.Mock()
-    adapter._session = session
+    adapter._session = recording_session
     support = SupportUtilities(adapter)
-    support.run_write = mock.Mock(return_value=None)  # type: ignore[assignment]
     support.perform_delete("Unit", "id", 1, None)
     assert adapter.auto_open_calls == 1
     assert adapter.auto_close_calls == 1
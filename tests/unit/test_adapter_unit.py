@@ -2,137 +2,135 @@
 
 from __future__ import annotations
 
-from types import SimpleNamespace
-from typing import Any, Dict
-from unittest import mock
+from types import MappingProxyType
 
 import pytest
+from neo4j import Driver, GraphDatabase
 
 from daplug_cypher.adapter import CypherAdapter
 
 
-class FakeResult(list):
-    def consume(self) -> None:  # pragma: no cover - behaviour shim
-        return None
-
-
-class FakeTx:
-    def __init__(self, result: Any = None) -> None:
-        self.result = result if result is not None else []
-        self.runs: list[tuple[str, Dict[str, Any]]] = []
-
-    def run(self, query: str, **params: Any) -> FakeResult:
-        self.runs.append((query, params))
-        data = self.result if isinstance(self.result, list) else [self.result]
-        return FakeResult(data)
-
-
-def _build_adapter() -> CypherAdapter:
-    return CypherAdapter(auto_connect=False, bolt={"url": "bolt://unit", "user": "neo"})
-
-
-def _stub_support(**overrides: Any) -> SimpleNamespace:
-    stub = SimpleNamespace(
-        map_with_schema=mock.Mock(side_effect=lambda data: dict(data)),
-        default_create_query=mock.Mock(return_value="CREATE (n:Unit) SET n = $placeholder RETURN n"),
-        execute_write=mock.Mock(),
-        extract_publish_options=mock.Mock(return_value={}),
-        extract_read_before_delete_options=mock.Mock(return_value={}),
-        publish_with_operation=mock.Mock(),
-        match=mock.Mock(return_value={}),
-        clean_placeholders=mock.Mock(return_value={}),
-        run_read=mock.Mock(return_value=["row"]),
-        extract_merge_options=mock.Mock(return_value={}),
-        merge_payload=mock.Mock(),
-        default_update_query=mock.Mock(return_value="MATCH (n:Unit) RETURN n"),
-        map_with_schema_update=mock.Mock(),
-        get_before_delete=mock.Mock(return_value={}),
-        perform_delete=mock.Mock(),
-        run_write=mock.Mock(return_value=["result"]),
-        first_node=mock.Mock(),
+@pytest.fixture(scope="module", autouse=True)
+def _patched_driver(module_mocker):
+    return module_mocker.patch.object(GraphDatabase, "driver")
+
+
+@pytest.fixture
+def driver_ctor(_patched_driver):
+    _patched_driver.reset_mock(return_value=True, side_effect=True)
+    return _patched_driver
+
+
+_READ_QUERY = "MATCH () RETURN 1"
+_LOOKUP_QUERY = "MATCH (n) WHERE n.id = $id RETURN n"
+_CREATE_QUERY = "CREATE (n:Unit) SET n = $placeholder RETURN n"
+
+SNS_CREATE = MappingProxyType({"operation": "create"})
+SNS_SERVICE_UNIT = MappingProxyType({"service": "unit"})
+
+_UPDATE_ARGS = {
+    "data": {},
+    "node": "Unit",
+    "identifier": "id",
+    "idempotence_key": "version",
+    "original_idempotence_value": 1,
+    "query": _READ_QUERY,
+}
+
+
+def _without(params: dict, key: str) -> dict:
+    return {name: value for name, value in params.items() if name != key}
+
+
+@pytest.fixture
+def node_stub(adapter, stub_support, mocker):
+    stub = stub_support(
+        match=mocker.Mock(return_value=[object()]),
+        first_node=mocker.Mock(return_value={"id": "abc", "version": 1, "status": "alpha"}),
+        merge_payload=mocker.Mock(side_effect=lambda original, incoming, **_: {**original, **incoming}),
+        clean_placeholders=mocker.Mock(side_effect=lambda placeholder: placeholder),
     )
-    for key, value in overrides.items():
-        setattr(stub, key, value)
+    adapter.support = stub  # type: ignore[assignment]
     return stub
 
 
-def test_create_runs_write_and_publishes() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support()
-    tx = FakeTx()
-    stub.execute_write.side_effect = lambda callback: callback(tx)
+def test_create_runs_write_and_publishes(adapter, stub_support, neo4j_tx) -> None:
+    stub = stub_support()
+    stub.execute_write.side_effect = lambda callback: callback(neo4j_tx)
     adapter.support = stub  # type: ignore[assignment]
 
     result = adapter.create(data={"x": 1}, node="Unit")
 
     assert result == {"x": 1}
     stub.map_with_schema.assert_called_once_with({"x": 1})
-    assert tx.runs[0][0].startswith("CREATE")
+    neo4j_tx.run.assert_called_once_with(_CREATE_QUERY, placeholder={"x": 1})
+    neo4j_tx.run.return_value.consume.assert_called_once()
     stub.publish_with_operation.assert_called_once_with("create", {"x": 1}, **{})
 
 
-def test_read_passes_options_to_support() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(match=mock.Mock(return_value={"Unit": []}))
+def test_read_passes_options_to_support(adapter, stub_support, mocker) -> None:
+    stub = stub_support(match=mocker.Mock(return_value={"Unit": []}))
     adapter.support = stub  # type: ignore[assignment]
 
-    adapter.read(query="MATCH () RETURN 1", node="Unit", placeholder={"id": 1}, serialize=False, search=True)
+    adapter.read(
+        query=_READ_QUERY, node="Unit", placeholder={"id": 1}, serialize=False, search=True, materialize=False
+    )
 
     stub.match.assert_called_once_with(
-        "MATCH () RETURN 1",
+        _READ_QUERY,
         {"id": 1},
         node_label="Unit",
         serialize=False,
         search=True,
+        materialize=False,
     )
 
 
-def test_query_runs_with_clean_placeholders() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(
-        clean_placeholders=mock.Mock(return_value={"id": 2}),
-        run_read=mock.Mock(return_value=["row"]),
+def test_query_runs_with_clean_placeholders(adapter, stub_support, mocker) -> None:
+    stub = stub_support(
+        clean_placeholders=mocker.Mock(return_value={"id": 2}),
+        run_read=mocker.Mock(return_value=["row"]),
     )
     adapter.support = stub  # type: ignore[assignment]
 
-    result = adapter.query(query="MATCH (n) WHERE n.id = $id RETURN n", placeholder={"id": "2"})
+    result = adapter.query(query=_LOOKUP_QUERY, placeholder={"id": "2"})
 
     assert result == ["row"]
     stub.clean_placeholders.assert_called_once_with({"id": "2"})
-    stub.run_read.assert_called_once_with("MATCH (n) WHERE n.id = $id RETURN n", {"id": 2})
-
-
-def test_update_executes_full_flow() -> None:
-    adapter = _build_adapter()
-    merged = {"test_id": "abc", "version": 2, "status": "beta"}
-    stub = _stub_support(
-        match=mock.Mock(return_value=[object()]),
-        first_node=mock.Mock(return_value={"test_id": "abc", "version": 1, "status": "alpha"}),
-        merge_payload=mock.Mock(return_value=merged),
-        map_with_schema=mock.Mock(side_effect=lambda data: data),
-        default_update_query=mock.Mock(return_value="MATCH (n:Unit) RETURN n"),
-        clean_placeholders=mock.Mock(return_value={"id": "abc", "version": 1, "placeholder": merged}),
-    )
-    tx = FakeTx(["ok"])
-    stub.execute_write.side_effect = lambda callback: callback(tx)
-    adapter.support = stub  # type: ignore[assignment]
+    stub.run_read.assert_called_once_with(_LOOKUP_QUERY, {"id": 2})
 
-    result = adapter.update(
-        data={"status": "beta", "version": 2},
-        node="Unit",
-        identifier="test_id",
-        idempotence_key="version",
-        original_idempotence_value=1,
-        query="MATCH (n:Unit) RETURN n",
-    )
 
-    assert result["status"] == "beta"
-    stub.publish_with_operation.assert_called_once_with("update", merged, **{})
+def test_update_executes_full_flow(adapter, node_stub, neo4j_tx) -> None:
+    merged = {"id": "abc", "version": 2, "status": "beta"}
+    neo4j_tx.run.return_value = ["ok"]
+    node_stub.execute_write.side_effect = lambda callback: callback(neo4j_tx)
+
+    result = adapter.update(**{**_UPDATE_ARGS, "data": {"status": "beta", "version": 2}})
+
+    assert result == merged
+    neo4j_tx.run.assert_called_once_with("MATCH (n:Unit) RETURN n", id="abc", version=1, placeholder=merged)
+    node_stub.publish_with_operation.assert_called_once_with("update", merged)
+
 
+@pytest.mark.parametrize(
+    ("stubbed", "returns", "message"),
+    [
+        pytest.param("match", [], "No records found", id="no-records"),
+        pytest.param("first_node", None, "Unable to read existing node", id="missing-node"),
+        pytest.param("execute_write", [], "No records updated", id="no-rows-updated"),
+    ],
+)
+def test_update_raises_atomic_errors(adapter, node_stub, stubbed: str, returns, message: str) -> None:
+    getattr(node_stub, stubbed).return_value = returns
 
-def test_delete_short_circuits_when_no_record() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(get_before_delete=mock.Mock(return_value={}))
+    with pytest.raises(ValueError, match=f"ATOMIC ERROR: {message}"):
+        adapter.update(**{**_UPDATE_ARGS, "data": {"status": "beta"}})
+
+    node_stub.publish_with_operation.assert_not_called()
+
+
+def test_delete_short_circuits_when_no_record(adapter, stub_support, mocker) -> None:
+    stub = stub_support(get_before_delete=mocker.Mock(return_value={}))
     adapter.support = stub  # type: ignore[assignment]
 
     result = adapter.delete(delete_identifier="abc", node="Unit", identifier="test_id")
@@ -141,9 +139,8 @@ def test_delete_short_circuits_when_no_record() -> None:
     stub.perform_delete.assert_not_called()
 
 
-def test_delete_executes_flow_and_publishes() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(get_before_delete=mock.Mock(return_value={"id": "abc"}))
+def test_delete_executes_flow_and_publishes(adapter, stub_support, mocker) -> None:
+    stub = stub_support(get_before_delete=mocker.Mock(return_value={"id": "abc"}))
     adapter.support = stub  # type: ignore[assignment]
 
     result = adapter.delete(delete_identifier="abc", node="Unit", identifier="test_id", delete_query="QUERY")
@@ -153,23 +150,10 @@ def test_delete_executes_flow_and_publishes() -> None:
     stub.publish_with_operation.assert_called_once_with("delete", {"id": "abc"}, **{})
 
 
-def test_create_relationship_requires_edge() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.create_relationship(query="MATCH (n) RETURN n", placeholder={})
-
-
-def test_delete_relationship_requires_delete_clause() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.delete_relationship(query="MATCH (n)-[r]->(m) RETURN r", placeholder={})
-
-
-def test_create_relationship_executes_support_flow() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(
-        clean_placeholders=mock.Mock(return_value={"a": 1}),
-        run_write=mock.Mock(return_value=["r"]),
+def test_create_relationship_executes_support_flow(adapter, stub_support, mocker) -> None:
+    stub = stub_support(
+        clean_placeholders=mocker.Mock(return_value={"a": 1}),
+        run_write=mocker.Mock(return_value=["r"]),
     )
     adapter.support = stub  # type: ignore[assignment]
 
@@ -182,11 +166,10 @@ def test_create_relationship_executes_support_flow() -> None:
     stub.publish_with_operation.assert_called_once_with("create", ["r"], **{})
 
 
-def test_delete_relationship_executes_support_flow() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(
-        clean_placeholders=mock.Mock(return_value={"a": 1}),
-        run_write=mock.Mock(return_value=["r"]),
+def test_delete_relationship_executes_support_flow(adapter, stub_support, mocker) -> None:
+    stub = stub_support(
+        clean_placeholders=mocker.Mock(return_value={"a": 1}),
+        run_write=mocker.Mock(return_value=["r"]),
     )
     adapter.support = stub  # type: ignore[assignment]
 
@@ -199,173 +182,172 @@ def test_delete_relationship_executes_support_flow() -> None:
     stub.publish_with_operation.assert_called_once_with("delete", ["r"], **{})
 
 
-def test_open_initializes_driver(monkeypatch) -> None:
-    session_mock = mock.Mock()
-    driver_mock = mock.Mock()
-    driver_mock.session.return_value = session_mock
-    driver_ctor = mock.Mock(return_value=driver_mock)
-    import importlib
+def test_publish_uses_injected_publisher(mocker) -> None:
+    publisher = mocker.Mock()
+    adapter = CypherAdapter(
+        auto_connect=False,
+        bolt={"url": "bolt://unit", "user": "neo"},
+        sns_arn="arn:aws:sns:us-east-2:123456789012:unit",
+        publisher=publisher,
+    )
+
+    adapter.publish({"id": 1}, sns_attributes=SNS_CREATE)
+
+    publisher.publish.assert_called_once_with(
+        endpoint=None,
+        arn="arn:aws:sns:us-east-2:123456789012:unit",
+        attributes={"operation": {"DataType": "String", "StringValue": "create"}},
+        data={"id": 1},
+        fifo_group_id=None,
+        fifo_duplication_id=None,
+    )
+
+
+def test_publish_batch_formats_entries_for_batch_publisher(mocker) -> None:
+    publisher = mocker.Mock()
+    adapter = CypherAdapter(
+        auto_connect=False, sns_arn="arn:unit", sns_attributes=SNS_SERVICE_UNIT, publisher=publisher
+    )
+
+    adapter.publish_batch([({"id": 1}, {"sns_attributes": SNS_CREATE, "fifo_group_id": "group"})])
+
+    publisher.publish_batch.assert_called_once_with(
+        endpoint=None,
+        arn="arn:unit",
+        entries=[
+            {
+                "data": {"id": 1},
+                "attributes": {
+                    "service": {"DataType": "String", "StringValue": "unit"},
+                    "operation": {"DataType": "String", "StringValue": "create"},
+                },
+                "fifo_group_id": "group",
+                "fifo_duplication_id": None,
+            }
+        ],
+    )
+
+
+def test_publish_batch_falls_back_to_single_publishes(mocker) -> None:
+    publisher = mocker.Mock(spec=["publish"])
+    adapter = CypherAdapter(auto_connect=False, sns_arn="arn:unit", publisher=publisher)
+
+    adapter.publish_batch([({"id": 1}, {}), ({"id": 2}, {})])
+
+    assert [call.kwargs["data"] for call in publisher.publish.call_args_list] == [{"id": 1}, {"id": 2}]
 
-    adapter_module = importlib.import_module("daplug_cypher.adapter")
 
-    monkeypatch.setattr(adapter_module.GraphDatabase, "driver", driver_ctor)
+def test_open_initializes_driver(driver_ctor, mock_driver, neo4j_session) -> None:
+    driver_ctor.return_value = mock_driver
     adapter = CypherAdapter(auto_connect=False, bolt={"url": "bolt://unit", "user": "neo", "password": "pass"})
 
     adapter.open()
 
     driver_ctor.assert_called_once_with("bolt://unit", auth=("neo", "pass"), **adapter.driver_config)
-    assert adapter._session == session_mock
+    assert adapter._session is neo4j_session
 
 
-def test_close_shuts_down_resources() -> None:
-    adapter = _build_adapter()
-    session_mock = mock.Mock()
-    driver_mock = mock.Mock()
-    adapter._session = session_mock
-    adapter._driver = driver_mock
+def test_open_uses_injected_driver(driver_ctor, mock_driver, neo4j_session) -> None:
+    adapter = CypherAdapter(auto_connect=False, driver=mock_driver)
 
+    adapter.open()
     adapter.close()
 
-    session_mock.close.assert_called_once()
-    driver_mock.close.assert_called_once()
-    assert adapter._session is None
-    assert adapter._driver is None
+    driver_ctor.assert_not_called()
+    neo4j_session.close.assert_called_once_with()
+    mock_driver.close.assert_not_called()
+    assert adapter._driver is mock_driver
 
 
-def test_create_requires_node_label() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.create(data={"x": 1})
+def test_open_reuses_pooled_driver(driver_ctor, mocker) -> None:
+    driver_ctor.side_effect = lambda *args, **kwargs: mocker.create_autospec(Driver, instance=True)
+    bolt = {"url": "bolt://unit", "user": "neo", "password": "pass"}
+    first = CypherAdapter(auto_connect=False, bolt=bolt)
+    second = CypherAdapter(auto_connect=False, bolt=bolt)
+    other = CypherAdapter(auto_connect=False, bolt={**bolt, "password": "other"})
 
+    first.open()
+    second.open()
+    other.open()
 
-def test_create_requires_payload() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.create(node="Unit")
+    assert first._driver is second._driver
+    assert other._driver is not first._driver
+    assert driver_ctor.call_count == 2
+    first._driver.close.assert_not_called()
 
 
-def test_read_requires_query() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.read(node="Unit")
+def test_open_keeps_drivers_in_use_when_credentials_change(driver_ctor, mocker) -> None:
+    driver_ctor.side_effect = lambda *args, **kwargs: mocker.create_autospec(Driver, instance=True)
+    bolt = {"url": "bolt://unit", "user": "neo", "password": "pass"}
+    stale = CypherAdapter(auto_connect=False, bolt=bolt)
+    rotated = CypherAdapter(auto_connect=False, bolt={**bolt, "password": "rotated"})
 
+    stale.open()
+    rotated.open()
+    stale.close()
+    stale.open()
 
-def test_query_requires_placeholder_markers() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.query(query="MATCH (n) RETURN n")
+    assert driver_ctor.call_count == 2
+    stale._driver.close.assert_not_called()
+    rotated._driver.close.assert_not_called()
 
 
-def test_update_requires_node_label() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            identifier="id",
-            idempotence_key="version",
-            original_idempotence_value=1,
-            query="MATCH () RETURN 1",
-        )
+def test_reset_pool_after_fork_forgets_parent_drivers(adapter, driver_ctor, mock_driver) -> None:
+    driver_ctor.return_value = mock_driver
+    adapter.open()
 
+    CypherAdapter._reset_pool_after_fork()
 
-def test_update_requires_identifier_and_idempotence_key() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            node="Unit",
-            idempotence_key="version",
-            original_idempotence_value=1,
-            query="MATCH () RETURN 1",
-        )
+    assert not CypherAdapter._driver_pool
+    mock_driver.close.assert_not_called()
 
 
-def test_update_requires_original_version() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            node="Unit",
-            identifier="id",
-            idempotence_key="version",
-            query="MATCH () RETURN 1",
-        )
+def test_shutdown_pool_closes_pooled_drivers(adapter, driver_ctor, mock_driver) -> None:
+    driver_ctor.return_value = mock_driver
+    adapter.open()
+    adapter.close()
 
+    CypherAdapter.shutdown_pool()
 
-def test_update_requires_query_text() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            node="Unit",
-            identifier="id",
-            idempotence_key="version",
-            original_idempotence_value=1,
-        )
-
-
-def test_update_raises_when_no_records_found() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(match=mock.Mock(return_value=[]))
-    adapter.support = stub  # type: ignore[assignment]
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            node="Unit",
-            identifier="id",
-            idempotence_key="version",
-            original_idempotence_value=1,
-            query="MATCH () RETURN 1",
-        )
-
-
-def test_update_raises_when_first_node_missing() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(
-        match=mock.Mock(return_value=[object()]),
-        first_node=mock.Mock(return_value=None),
-    )
-    adapter.support = stub  # type: ignore[assignment]
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={},
-            node="Unit",
-            identifier="id",
-            idempotence_key="version",
-            original_idempotence_value=1,
-            query="MATCH () RETURN 1",
-        )
-
-
-def test_update_raises_when_no_rows_updated() -> None:
-    adapter = _build_adapter()
-    stub = _stub_support(
-        match=mock.Mock(return_value=[object()]),
-        first_node=mock.Mock(return_value={"id": "1"}),
-        merge_payload=mock.Mock(return_value={"id": "1"}),
-        map_with_schema=mock.Mock(return_value={"id": "1"}),
-        clean_placeholders=mock.Mock(return_value={"id": "1"}),
-        execute_write=mock.Mock(return_value=[]),
-    )
-    adapter.support = stub  # type: ignore[assignment]
-    with pytest.raises(ValueError):
-        adapter.update(
-            data={"id": "1"},
-            node="Unit",
-            identifier="id",
-            idempotence_key="version",
-            original_idempotence_value=1,
-            query="MATCH () RETURN 1",
-        )
-
-
-def test_delete_requires_identifier() -> None:
-    adapter = _build_adapter()
-    with pytest.raises(ValueError):
-        adapter.delete(delete_identifier="abc", node="Unit")
+    mock_driver.close.assert_called_once_with()
+    assert not CypherAdapter._driver_pool
+
+
+def test_close_shuts_down_session_and_keeps_pooled_driver(adapter, recording_session, mock_driver) -> None:
+    adapter._session = recording_session
+    adapter._driver = mock_driver
+
+    adapter.close()
+
+    assert recording_session.closed
+    mock_driver.close.assert_not_called()
+    assert adapter._session is None
+    assert adapter._driver is None
 
 
-def test_delete_requires_delete_identifier() -> None:
-    adapter = _build_adapter()
+@pytest.mark.parametrize(
+    ("method", "kwargs"),
+    [
+        pytest.param("create", {"data": {"x": 1}}, id="create-node-label"),
+        pytest.param("create", {"node": "Unit"}, id="create-payload"),
+        pytest.param("read", {"node": "Unit"}, id="read-query"),
+        pytest.param("query", {"query": "MATCH (n) RETURN n"}, id="query-placeholder-markers"),
+        pytest.param("update", _without(_UPDATE_ARGS, "node"), id="update-node-label"),
+        pytest.param("update", _without(_UPDATE_ARGS, "identifier"), id="update-identifier"),
+        pytest.param("update", _without(_UPDATE_ARGS, "original_idempotence_value"), id="update-original-version"),
+        pytest.param("update", _without(_UPDATE_ARGS, "query"), id="update-query"),
+        pytest.param("delete", {"delete_identifier": "abc", "node": "Unit"}, id="delete-identifier"),
+        pytest.param("delete", {"node": "Unit", "identifier": "id"}, id="delete-delete-identifier"),
+        pytest.param(
+            "create_relationship", {"query": "MATCH (n) RETURN n", "placeholder": {}}, id="create-relationship-edge"
+        ),
+        pytest.param(
+            "delete_relationship",
+            {"query": "MATCH (n)-[r]->(m) RETURN r", "placeholder": {}},
+            id="delete-relationship-delete-clause",
+        ),
+    ],
+)
+def test_operation_requires_valid_arguments(adapter, method: str, kwargs: dict) -> None:
     with pytest.raises(ValueError):
-        adapter.delete(node="Unit", identifier="id")
+        getattr(adapter, method)(**kwargs)
@@ -1,15 +1,23 @@
 """Unit tests for parameter utilities."""
 
+import sys
+from collections import UserDict
+from types import MappingProxyType
+
 from daplug_cypher.cypher.parameters import convert_placeholders
 from daplug_cypher.cypher import parameters as parameters_module
 
 
 def test_convert_placeholders_converts_numeric_strings() -> None:
-    placeholder = {"a": "1", "b": "-2", "c": "NaN"}
+    placeholder = {"a": "1", "b": "-2", "c": "NaN", "d": "", "e": "-", "f": "--3", "g": "\u00b2"}
     result = convert_placeholders(placeholder)
     assert result["a"] == 1
     assert result["b"] == -2
     assert result["c"] == "NaN"
+    assert result["d"] == ""
+    assert result["e"] == "-"
+    assert result["f"] == "--3"
+    assert result["g"] == "\u00b2"
 
 
 def test_convert_placeholders_handles_nested_structures() -> None:
@@ -30,11 +38,39 @@ def test_convert_placeholders_handles_nested_structures() -> None:
     assert result["mixed"][2]["deep"] == -7
 
 
-def test_convert_placeholders_handles_int_conversion_fail(monkeypatch) -> None:
+def test_convert_placeholders_passes_scalars_through() -> None:
+    class Label(str):
+        pass
+
+    placeholder = {"int": 1, "float": 1.5, "bool": True, "none": None, "list": [2, False], "label": Label("8")}
+    result = convert_placeholders(placeholder)
+    assert result == {"int": 1, "float": 1.5, "bool": True, "none": None, "list": [2, False], "label": 8}
+    assert result["bool"] is True
+
+
+def test_convert_placeholders_accepts_any_mapping_at_the_root() -> None:
+    assert convert_placeholders(MappingProxyType({"a": "1"})) == {"a": 1}
+    assert convert_placeholders(UserDict({"a": "1", "b": ["2"]})) == {"a": 1, "b": [2]}
+
+
+def test_convert_placeholders_handles_int_conversion_fail(mocker) -> None:
     def broken_int(_value: str) -> int:
         raise ValueError
 
-    monkeypatch.setattr(parameters_module, "int", broken_int, raising=False)
+    mocker.patch.object(parameters_module, "int", broken_int, create=True)
     placeholder = {"value": "10"}
     result = convert_placeholders(placeholder)
     assert result["value"] == "10"
+
+
+def test_convert_placeholders_handles_nesting_beyond_recursion_limit() -> None:
+    placeholder: dict = {}
+    current = placeholder
+    for _ in range(sys.getrecursionlimit() + 100):
+        current["child"] = {}
+        current = current["child"]
+    current["leaf"] = ["1"]
+    result = convert_placeholders(placeholder)
+    for _ in range(sys.getrecursionlimit() + 100):
+        result = result["child"]
+    assert result == {"leaf": [1]}
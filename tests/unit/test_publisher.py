@@ -0,0 +1,106 @@
+"""Unit tests for the batching SNS publisher."""
+
+from __future__ import annotations
+
+from typing import Dict
+from unittest import mock
+
+import pytest
+
+from daplug_cypher import publisher
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _publisher_patches(module_mocker) -> Dict[str, mock.MagicMock]:
+    return {
+        "client": module_mocker.patch.object(publisher.boto3, "client"),
+        "log": module_mocker.patch.object(publisher.logger, "log"),
+    }
+
+
+@pytest.fixture
+def patches(_publisher_patches: Dict[str, mock.MagicMock]) -> Dict[str, mock.MagicMock]:
+    for patched in _publisher_patches.values():
+        patched.reset_mock(return_value=True, side_effect=True)
+    _publisher_patches["client"].return_value.publish_batch.return_value = {"Successful": [], "Failed": []}
+    return _publisher_patches
+
+
+def test_publish_batch_chunks_entries_to_sns_limit(patches) -> None:
+    entries = [{"data": {"id": index}, "attributes": {}} for index in range(12)]
+
+    publisher.publish_batch(arn="arn:unit", endpoint="http://sns", entries=entries)
+
+    patches["client"].assert_called_once_with("sns", region_name=None, endpoint_url="http://sns")
+    calls = patches["client"].return_value.publish_batch.call_args_list
+    assert [len(call.kwargs["PublishBatchRequestEntries"]) for call in calls] == [10, 2]
+    assert calls[1].kwargs["PublishBatchRequestEntries"][0]["Id"] == "10"
+    assert calls[1].kwargs["PublishBatchRequestEntries"][0]["Message"] == '{"id": 10}'
+
+
+def test_publish_batch_splits_chunks_by_request_size(patches) -> None:
+    body = "x" * (publisher.SNS_BATCH_MAX_BYTES // 3)
+    entries = [{"data": {"body": body}, "attributes": {}} for _ in range(4)]
+
+    publisher.publish_batch(arn="arn:unit", entries=entries)
+
+    calls = patches["client"].return_value.publish_batch.call_args_list
+    assert [len(call.kwargs["PublishBatchRequestEntries"]) for call in calls] == [2, 2]
+
+
+def test_publish_batch_keeps_sending_after_a_failed_chunk(patches) -> None:
+    batch_mock = patches["client"].return_value.publish_batch
+    batch_mock.side_effect = [RuntimeError("throttled"), {"Successful": [{"Id": "10"}], "Failed": []}]
+    entries = [{"data": {"id": index}} for index in range(11)]
+
+    publisher.publish_batch(arn="arn:unit", entries=entries)
+
+    assert batch_mock.call_count == 2
+    patches["log"].assert_called_once_with(level="WARN", log={"error": "publish_sns_batch_error: throttled"})
+
+
+def test_publish_batch_logs_rejected_entries(patches) -> None:
+    failed = [{"Id": "1", "Code": "InvalidParameter", "Message": "bad attribute", "SenderFault": True}]
+    patches["client"].return_value.publish_batch.return_value = {"Successful": [{"Id": "0"}], "Failed": failed}
+
+    publisher.publish_batch(arn="arn:unit", entries=[{"data": {"id": 0}}, {"data": {"id": 1}}])
+
+    patches["log"].assert_called_once_with(
+        level="WARN", log={"error": "publish_sns_batch_failed", "failed": failed}
+    )
+
+
+def test_publish_batch_skips_entries_that_cannot_be_serialized(patches) -> None:
+    entries = [{"data": {"id": 1}}, {"data": {"id": object()}}, {"data": {"id": 3}}]
+
+    publisher.publish_batch(arn="arn:unit", entries=entries)
+
+    sent = patches["client"].return_value.publish_batch.call_args.kwargs["PublishBatchRequestEntries"]
+    assert [entry["Id"] for entry in sent] == ["0", "2"]
+    patches["log"].assert_called_once()
+    assert patches["log"].call_args.kwargs["log"]["error"].startswith("publish_sns_batch_entry_error: ")
+
+
+def test_publish_batch_sets_fifo_fields(patches) -> None:
+    entries = [{"data": {"id": 1}, "fifo_group_id": "group", "fifo_duplication_id": "dedupe"}]
+
+    publisher.publish_batch(arn="arn:unit.fifo", entries=entries)
+
+    entry = patches["client"].return_value.publish_batch.call_args.kwargs["PublishBatchRequestEntries"][0]
+    assert entry["MessageGroupId"] == "group"
+    assert entry["MessageDeduplicationId"] == "dedupe"
+
+
+def test_publish_batch_skips_without_arn_or_data(patches) -> None:
+    publisher.publish_batch(arn=None, entries=[{"data": {"id": 1}}])
+    publisher.publish_batch(arn="arn:unit", entries=[{"data": None}])
+
+    patches["client"].assert_not_called()
+
+
+def test_publish_batch_logs_sns_errors(patches) -> None:
+    patches["client"].side_effect = RuntimeError("down")
+
+    publisher.publish_batch(arn="arn:unit", entries=[{"data": {"id": 1}}])
+
+    patches["log"].assert_called_once_with(level="WARN", log={"error": "publish_sns_batch_error: down"})